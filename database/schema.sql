@@ -48,6 +48,42 @@ CREATE INDEX IF NOT EXISTS idx_message_uuid ON message(uuid);
 CREATE INDEX IF NOT EXISTS idx_message_status ON message(status);
 CREATE INDEX IF NOT EXISTS idx_message_next_retry ON message(next_retry_at);
 CREATE INDEX IF NOT EXISTS idx_message_created ON message(created_at);
+-- Only finished messages are ever purged
+CREATE INDEX IF NOT EXISTS idx_message_purge ON message(status, updated_at)
+    WHERE status IN ('sent', 'dead', 'cancelled');
+-- Worker polling: queued messages in arrival order, failed ones by retry time
+CREATE INDEX IF NOT EXISTS idx_message_queued ON message(status, created_at)
+    WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_message_retry ON message(status, next_retry_at)
+    WHERE status = 'failed';
+
+-- Per-status message counts, kept current by the triggers below
+CREATE TABLE IF NOT EXISTS message_stats (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+-- Backfill for databases created before the rollup existed (no-op once the triggers run)
+INSERT OR IGNORE INTO message_stats (status, count)
+    SELECT status, COUNT(*) FROM message GROUP BY status;
+
+CREATE TRIGGER IF NOT EXISTS trg_message_stats_insert AFTER INSERT ON message
+BEGIN
+    INSERT INTO message_stats (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_message_stats_delete AFTER DELETE ON message
+BEGIN
+    UPDATE message_stats SET count = count - 1 WHERE status = OLD.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_message_stats_update AFTER UPDATE OF status ON message
+    WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE message_stats SET count = count - 1 WHERE status = OLD.status;
+    INSERT INTO message_stats (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+END;
 
 CREATE TABLE IF NOT EXISTS attachment (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
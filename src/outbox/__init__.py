@@ -1,20 +1,31 @@
 """Outbox - Centralized Mail Queue Service."""
 
-from outbox.client import Attachment, Message, MessageStatus, OutboxClient
-
-__all__ = ["OutboxClient", "Message", "MessageStatus", "Attachment", "create_app"]
-
+from outbox.client import AsyncOutboxClient, Attachment, Message, MessageStatus, OutboxClient
+
+__all__ = [
+    "OutboxClient",
+    "AsyncOutboxClient",
+    "Message",
+    "MessageStatus",
+    "Attachment",
+    "create_app",
+]
+
+import importlib
 import os
 from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 from zoneinfo import ZoneInfo
 
-import apsw
 from flask import Flask
 from werkzeug.wrappers import Response
 
-from outbox.config import KEY_MAP, REGISTRY, parse_value
+from outbox.config import CONFIG_BINDINGS, parse_value
+
+# Blueprint modules under outbox.blueprints, imported only when an app is built
+_BLUEPRINTS = ("auth", "api", "admin", "admin_keys", "admin_queue", "admin_sql")
 
 
 def create_app(test_config: dict[str, Any] | None = None) -> Flask:
@@ -50,8 +61,13 @@ def create_app(test_config: dict[str, Any] | None = None) -> Flask:
     else:
         _load_config_from_db(app)
 
+    # test_config may point DATABASE_PATH outside the instance folder
+    Path(app.config["DATABASE_PATH"]).parent.mkdir(parents=True, exist_ok=True)
+
+    from outbox.audit import flush_audit_log
     from outbox.db import close_db
 
+    app.after_request(flush_audit_log)
     app.teardown_appcontext(close_db)
 
     # Initialize gatekeeper_client
@@ -59,51 +75,47 @@ def create_app(test_config: dict[str, Any] | None = None) -> Flask:
     gk_url = app.config.get("GATEKEEPER_URL", "")
     gk_api_key = app.config.get("GATEKEEPER_API_KEY", "")
 
-    if gk_db_path:
-        from gatekeeper import GatekeeperClient
-
-        gk = GatekeeperClient(db_path=gk_db_path)
-        gk.init_app(app, cookie_name="gk_session")
-        app.config["GATEKEEPER_CLIENT"] = gk
-    elif gk_url and gk_api_key:
+    if gk_db_path or (gk_url and gk_api_key):
         from gatekeeper import GatekeeperClient
 
-        gk = GatekeeperClient(server_url=gk_url, api_key=gk_api_key)
+        if gk_db_path:
+            gk = GatekeeperClient(db_path=gk_db_path)
+        else:
+            gk = GatekeeperClient(server_url=gk_url, api_key=gk_api_key)
         gk.init_app(app, cookie_name="gk_session")
         app.config["GATEKEEPER_CLIENT"] = gk
 
     # Register blueprints
-    from outbox.blueprints import admin, admin_keys, admin_queue, admin_sql, api, auth
-
-    app.register_blueprint(auth.bp)
-    app.register_blueprint(api.bp)
-    app.register_blueprint(admin.bp)
-    app.register_blueprint(admin_keys.bp)
-    app.register_blueprint(admin_queue.bp)
-    app.register_blueprint(admin_sql.bp)
+    for name in _BLUEPRINTS:
+        module = importlib.import_module(f"outbox.blueprints.{name}")
+        app.register_blueprint(module.bp)
 
-    # Jinja filters
-    def _get_user_timezone() -> ZoneInfo:
-        """Get user's timezone from request header or cookie."""
-        from flask import request
+    @app.before_request
+    def _load_request_context() -> None:
+        """Resolve per-request view state once instead of in every view and filter."""
+        from flask import g, request
 
+        g.is_htmx = request.headers.get("HX-Request") == "true"
         tz_name = request.headers.get("X-Timezone") or request.cookies.get("tz") or "UTC"
         try:
-            return ZoneInfo(tz_name)
+            ZoneInfo(tz_name)
         except Exception:
-            return ZoneInfo("UTC")
+            tz_name = "UTC"
+        g.user_tz_name = tz_name
+
+    # Jinja filters
+    def _get_user_timezone() -> str:
+        """Get the user's timezone name resolved for this request."""
+        from flask import g
+
+        return g.get("user_tz_name", "UTC")
 
     @app.template_filter("localdate")
     def localdate_filter(iso_string: str | None) -> str:
         if not iso_string:
             return ""
         try:
-            dt = datetime.fromisoformat(iso_string.replace("Z", "+00:00"))
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=UTC)
-            user_tz = _get_user_timezone()
-            local_dt = dt.astimezone(user_tz)
-            return local_dt.strftime("%b %d, %Y")
+            return _format_local(iso_string, _get_user_timezone(), False)
         except Exception:
             return iso_string[:10] if iso_string else ""
 
@@ -112,13 +124,7 @@ def create_app(test_config: dict[str, Any] | None = None) -> Flask:
         if not iso_string:
             return ""
         try:
-            dt = datetime.fromisoformat(iso_string.replace("Z", "+00:00"))
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=UTC)
-            user_tz = _get_user_timezone()
-            local_dt = dt.astimezone(user_tz)
-            tz_abbr = local_dt.strftime("%Z")
-            return local_dt.strftime(f"%b %d, %Y %H:%M {tz_abbr}")
+            return _format_local(iso_string, _get_user_timezone(), True)
         except Exception:
             return iso_string[:16].replace("T", " ") if iso_string else ""
 
@@ -132,8 +138,38 @@ def create_app(test_config: dict[str, Any] | None = None) -> Flask:
     return app
 
 
+def _parse_iso(iso_string: str) -> datetime:
+    """Parse an ISO 8601 timestamp, accepting a trailing ``Z`` for UTC."""
+    try:
+        return datetime.fromisoformat(iso_string)
+    except ValueError:
+        return datetime.fromisoformat(iso_string.replace("Z", "+00:00"))
+
+
+_MONTH_ABBR = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+@lru_cache(maxsize=4096)
+def _format_local(iso_string: str, tz_name: str, with_time: bool) -> str:
+    """Format an ISO timestamp in the given timezone.
+
+    Built from datetime attributes rather than strftime; cached because list
+    pages render the same timestamps for every row.
+    """
+    dt = _parse_iso(iso_string)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    local = dt.astimezone(ZoneInfo(tz_name))
+    date = f"{_MONTH_ABBR[local.month - 1]} {local.day:02d}, {local.year}"
+    if not with_time:
+        return date
+    return f"{date} {local.hour:02d}:{local.minute:02d} {local.tzname() or ''}"
+
+
 def _load_config_from_db(app: Flask) -> None:
     """Load configuration from the database into Flask app.config."""
+    import apsw
+
     db_path = app.config["DATABASE_PATH"]
 
     try:
@@ -152,23 +188,18 @@ def _load_config_from_db(app: Flask) -> None:
     db_values = {str(r[0]): str(r[1]) for r in rows}
     conn.close()
 
+    # Build every setting first and apply them together, so a bad value
+    # leaves app.config untouched
+    updates: dict[str, Any] = {}
+    for entry, flask_key in CONFIG_BINDINGS:
+        raw = db_values.get(entry.key)
+        updates[flask_key] = parse_value(entry, raw) if raw is not None else entry.default
+
     # Load SECRET_KEY from database
     if "secret_key" in db_values:
-        app.config["SECRET_KEY"] = db_values["secret_key"]
-
-    # Apply registry entries
-    for entry in REGISTRY:
-        flask_key = KEY_MAP.get(entry.key)
-        if not flask_key:
-            continue
-
-        raw = db_values.get(entry.key)
-        if raw is not None:
-            value = parse_value(entry, raw)
-        else:
-            value = entry.default
+        updates["SECRET_KEY"] = db_values["secret_key"]
 
-        app.config[flask_key] = value
+    app.config.update(updates)
 
     # Apply ProxyFix if any proxy values are non-zero
     x_for = app.config.get("PROXY_X_FORWARDED_FOR", 0)
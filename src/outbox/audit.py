@@ -0,0 +1,67 @@
+"""Request-scoped audit logging.
+
+Audit entries are queued on ``flask.g`` while a request runs and written in
+a single transaction once the response has been produced. A handler that
+has its own write transaction can instead write them inside it with
+write_queued(), so the audit rows commit together with the change.
+"""
+
+import logging
+
+import apsw
+from flask import g
+from werkzeug.wrappers import Response
+
+from outbox.db import get_db, transaction
+from outbox.timeutil import utc_now_iso
+
+_INSERT_AUDIT_SQL = (
+    "INSERT INTO audit_log (timestamp, actor, action, target, details) VALUES (?, ?, ?, ?, ?)"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def log(action: str, target: str | None = None, details: str | None = None) -> None:
+    """Queue an audit entry for the current request.
+
+    The actor is the API key for API requests, otherwise the logged-in user.
+    All entries from one request share a single timestamp.
+    """
+    if "now_iso" not in g:
+        g.now_iso = utc_now_iso()
+    now = g.now_iso
+    if "api_key" in g:
+        actor = f"api_key:{g.api_key.id}"
+    else:
+        actor = g.user.username if g.get("user") else None
+    g.setdefault("audit_queue", []).append((now, actor, action, target, details))
+
+
+def write_queued(cursor: apsw.Cursor) -> None:
+    """Write the entries queued so far through an open transaction's cursor."""
+    entries = g.pop("audit_queue", None)
+    if entries:
+        cursor.executemany(_INSERT_AUDIT_SQL, entries)
+
+
+def flush_audit_log(response: Response) -> Response:
+    """Write the audit entries queued during this request (after_request hook).
+
+    The change being audited has already committed, so a failure here is
+    logged rather than turned into an error response.
+    """
+    entries = g.pop("audit_queue", None)
+    if not entries or response.status_code >= 500:
+        return response
+    if get_db().in_transaction:
+        # Left open by the request (e.g. BEGIN in the SQL console); it is
+        # rolled back when the connection is released, so do not join it
+        logger.warning("Audit entries not written, transaction still open: %r", entries)
+        return response
+    try:
+        with transaction() as cursor:
+            cursor.executemany(_INSERT_AUDIT_SQL, entries)
+    except Exception:
+        logger.exception("Failed to write audit entries: %r", entries)
+    return response
@@ -3,29 +3,13 @@
 from flask import Blueprint, flash, g, redirect, render_template, request, send_file, url_for
 from werkzeug.wrappers import Response
 
+from outbox import audit
 from outbox.blueprints.auth import login_required
-from outbox.db import get_db
 from outbox.models.api_key import ApiKey
 
 bp = Blueprint("admin_keys", __name__, url_prefix="/admin/api-keys")
 
 
-def _audit_log(action: str, target: str | None = None, details: str | None = None) -> None:
-    from datetime import UTC, datetime
-
-    db = get_db()
-    now = datetime.now(UTC).isoformat()
-    actor = g.user.username if hasattr(g, "user") and g.user else None
-    db.execute(
-        "INSERT INTO audit_log (timestamp, actor, action, target, details) VALUES (?, ?, ?, ?, ?)",
-        (now, actor, action, target, details),
-    )
-
-
-def _is_htmx() -> bool:
-    return request.headers.get("HX-Request") == "true"
-
-
 @bp.route("/")
 @login_required
 def index() -> str:
@@ -40,14 +24,9 @@ def export() -> Response:
     """Export all API keys as XLSX."""
     from outbox.services.export import write_xlsx
 
-    keys = ApiKey.get_all()
     headers = ["Key", "Description", "Enabled", "Created", "Last Used"]
-    data = [
-        [k.key, k.description, "Yes" if k.enabled else "No", k.created_at, k.last_used_at or ""]
-        for k in keys
-    ]
-    path = write_xlsx(headers, data, "api_keys.xlsx")
-    _audit_log("api_keys_exported", details=f"{len(data)} API keys exported")
+    path, count = write_xlsx(headers, ApiKey.iter_export_rows(), "api_keys.xlsx")
+    audit.log("api_keys_exported", details=f"{count} API keys exported")
     return send_file(path, as_attachment=True, download_name="api_keys.xlsx")
 
 
@@ -61,7 +40,7 @@ def generate() -> Response:
         return redirect(url_for("admin_keys.index"))
 
     api_key = ApiKey.generate(description=description)
-    _audit_log("api_key_generated", str(api_key.id), f"Description: {description}")
+    audit.log("api_key_generated", str(api_key.id), f"Description: {description}")
 
     return redirect(url_for("admin_keys.index"))
 
@@ -77,12 +56,12 @@ def toggle(key_id: int) -> str | Response:
 
     if api_key.enabled:
         api_key.disable()
-        _audit_log("api_key_disabled", str(api_key.id))
+        audit.log("api_key_disabled", str(api_key.id))
     else:
         api_key.enable()
-        _audit_log("api_key_enabled", str(api_key.id))
+        audit.log("api_key_enabled", str(api_key.id))
 
-    if _is_htmx():
+    if g.is_htmx:
         return render_template("admin/api_key_row.html", key=api_key)
 
     return redirect(url_for("admin_keys.index"))
@@ -99,9 +78,9 @@ def delete(key_id: int) -> str | Response | tuple[str, int]:
 
     key_id_str = str(api_key.id)
     api_key.delete()
-    _audit_log("api_key_deleted", key_id_str)
+    audit.log("api_key_deleted", key_id_str)
 
-    if _is_htmx():
+    if g.is_htmx:
         return "", 200
 
     flash("API key deleted.", "success")
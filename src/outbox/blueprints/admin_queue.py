@@ -3,49 +3,36 @@
 from flask import Blueprint, flash, g, redirect, render_template, request, send_file, url_for
 from werkzeug.wrappers import Response
 
+from outbox import audit
 from outbox.blueprints.auth import login_required
-from outbox.db import get_db
+from outbox.db import run_concurrently
 from outbox.models.attachment import Attachment
 from outbox.models.message import Message
+from outbox.web_utils import clamp_int
 
 bp = Blueprint("admin_queue", __name__, url_prefix="/admin/queue")
 
 
-def _audit_log(action: str, target: str | None = None, details: str | None = None) -> None:
-    from datetime import UTC, datetime
-
-    db = get_db()
-    now = datetime.now(UTC).isoformat()
-    actor = g.user.username if hasattr(g, "user") and g.user else None
-    db.execute(
-        "INSERT INTO audit_log (timestamp, actor, action, target, details) VALUES (?, ?, ?, ?, ?)",
-        (now, actor, action, target, details),
-    )
-
-
-def _is_htmx() -> bool:
-    return request.headers.get("HX-Request") == "true"
-
-
 @bp.route("/")
 @login_required
 def index() -> str:
     """Queue browser: list messages with filters."""
     status = request.args.get("status")
     search = request.args.get("search", "").strip()
-    page = max(int(request.args.get("page", 1)), 1)
+    page = clamp_int("page", 1, 1, 10_000)
     per_page = 50
     offset = (page - 1) * per_page
 
-    messages = Message.list_messages(
-        status=status if status else None,
-        search=search if search else None,
-        limit=per_page,
-        offset=offset,
+    (messages, total), stats = run_concurrently(
+        lambda: Message.list_messages_with_total(
+            status=status if status else None,
+            search=search if search else None,
+            limit=per_page,
+            offset=offset,
+        ),
+        Message.stats,
     )
-    total = Message.count(status=status if status else None)
     total_pages = max((total + per_page - 1) // per_page, 1)
-    stats = Message.stats()
 
     return render_template(
         "admin/queue.html",
@@ -68,26 +55,13 @@ def export() -> Response:
     status = request.args.get("status")
     search = request.args.get("search", "").strip()
 
-    messages = Message.list_messages(
+    rows = Message.iter_export_rows(
         status=status if status else None,
         search=search if search else None,
-        limit=10000,
-        offset=0,
     )
     headers = ["Status", "To", "Subject", "Source", "Created", "Sent"]
-    data = [
-        [
-            m.status,
-            m.to_recipients,
-            m.subject,
-            m.source_app or "",
-            m.created_at,
-            m.sent_at or "",
-        ]
-        for m in messages
-    ]
-    path = write_xlsx(headers, data, "queue.xlsx")
-    _audit_log("queue_exported", details=f"{len(data)} messages exported")
+    path, count = write_xlsx(headers, rows, "queue.xlsx")
+    audit.log("queue_exported", details=f"{count} messages exported")
     return send_file(path, as_attachment=True, download_name="queue.xlsx")
 
 
@@ -121,15 +95,12 @@ def retry(msg_uuid: str) -> str | Response:
 
     message.retries_remaining = current_app.config["QUEUE_MAX_RETRIES"]
     message.update_status("queued")
-    _audit_log("message_retried", msg_uuid)
-    flash("Message re-queued for delivery.", "success")
+    audit.log("message_retried", msg_uuid)
 
-    if _is_htmx():
-        attachments = Attachment.get_for_message(message.id)
-        return render_template(
-            "admin/message_detail.html", message=message, attachments=attachments
-        )
+    if g.is_htmx:
+        return render_template("admin/message_row.html", msg=message)
 
+    flash("Message re-queued for delivery.", "success")
     return redirect(url_for("admin_queue.detail", msg_uuid=msg_uuid))
 
 
@@ -147,13 +118,10 @@ def cancel(msg_uuid: str) -> str | Response:
         return redirect(url_for("admin_queue.detail", msg_uuid=msg_uuid))
 
     message.update_status("cancelled")
-    _audit_log("message_cancelled", msg_uuid)
-    flash("Message cancelled.", "success")
+    audit.log("message_cancelled", msg_uuid)
 
-    if _is_htmx():
-        attachments = Attachment.get_for_message(message.id)
-        return render_template(
-            "admin/message_detail.html", message=message, attachments=attachments
-        )
+    if g.is_htmx:
+        return render_template("admin/message_row.html", msg=message)
 
+    flash("Message cancelled.", "success")
     return redirect(url_for("admin_queue.detail", msg_uuid=msg_uuid))
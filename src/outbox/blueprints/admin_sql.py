@@ -1,44 +1,44 @@
 """Admin blueprint for SQL query execution."""
 
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+
 import apsw
 from flask import (
     Blueprint,
     flash,
-    g,
     render_template,
     request,
     send_file,
 )
 from werkzeug.wrappers import Response
 
+from outbox import audit
 from outbox.blueprints.auth import login_required
-from outbox.db import get_db
+from outbox.db import get_db, get_db_path
+from outbox.models.app_setting import AppSetting
 
 bp = Blueprint("admin_sql", __name__, url_prefix="/admin/sql")
 
 
-def _audit_log(action: str, target: str | None = None, details: str | None = None) -> None:
-    from datetime import UTC, datetime
-
-    db = get_db()
-    now = datetime.now(UTC).isoformat()
-    actor = g.user.username if hasattr(g, "user") and g.user else None
-    db.execute(
-        "INSERT INTO audit_log (timestamp, actor, action, target, details) VALUES (?, ?, ?, ?, ?)",
-        (now, actor, action, target, details),
-    )
-
-
 def _get_schema() -> list[dict[str, object]]:
     """Get database schema: table names with their column names."""
-    db = get_db()
-    tables: list[dict[str, object]] = []
-    for (name,) in db.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
-    ).fetchall():
-        cols = [row[1] for row in db.execute(f"PRAGMA table_info({name})").fetchall()]
-        tables.append({"name": name, "columns": cols})
-    return tables
+    row = get_db().execute("PRAGMA schema_version").fetchone()
+    return _load_schema(get_db_path(), int(row[0]) if row else 0)
+
+
+@lru_cache(maxsize=1)
+def _load_schema(db_path: str, schema_version: int) -> list[dict[str, object]]:
+    """Read the schema; cached until DDL bumps SQLite's schema_version."""
+    rows = get_db().execute(
+        "SELECT m.name, p.name FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+        "WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' ORDER BY m.name, p.cid"
+    )
+    return [
+        {"name": name, "columns": [col for _, col in cols]}
+        for name, cols in groupby(rows, key=itemgetter(0))
+    ]
 
 
 @bp.route("/", methods=["GET"])
@@ -65,7 +65,9 @@ def execute() -> str:
         )
 
     try:
-        cursor = get_db().cursor()
+        db = get_db()
+        changes_before = db.total_changes()
+        cursor = db.cursor()
         cursor.execute(sql)
         try:
             desc = cursor.getdescription()
@@ -73,10 +75,13 @@ def execute() -> str:
             rows = cursor.fetchall()
         except apsw.ExecutionCompleteError:
             flash("Statement executed successfully.", "success")
-        _audit_log("sql_query", details=sql)
+        if db.total_changes() != changes_before:
+            # The statement may have written app_setting rows
+            AppSetting.invalidate_cache()
+        audit.log("sql_query", details=sql)
     except Exception as exc:
         flash(str(exc), "error")
-        _audit_log("sql_query_failed", details=f"{sql} -- error: {exc}")
+        audit.log("sql_query_failed", details=f"{sql} -- error: {exc}")
 
     return render_template("admin/sql.html", schema=schema, query=sql, columns=columns, rows=rows)
 
@@ -106,7 +111,6 @@ def export() -> str | Response:
             "admin/sql.html", schema=_get_schema(), query=sql, columns=[], rows=[]
         )
 
-    data = [list(row) for row in rows]
-    path = write_xlsx(headers, data, "query.xlsx")
-    _audit_log("sql_export", details=f"{sql} -- {len(data)} rows exported")
+    path, count = write_xlsx(headers, rows, "query.xlsx")
+    audit.log("sql_export", details=f"{sql} -- {count} rows exported")
     return send_file(path, as_attachment=True, download_name="query.xlsx")
@@ -1,22 +1,32 @@
 """JSON API blueprint with API key authentication."""
 
-import base64
+import binascii
 import json
+import os
 from collections.abc import Callable
 from functools import wraps
 from typing import Any
 
-from flask import Blueprint, g, jsonify, request
+import orjson
+from flask import Blueprint, current_app, g, request
 from werkzeug.wrappers import Response
 
-from outbox.db import get_db
+from outbox import audit
+from outbox.db import transaction
 from outbox.models.api_key import ApiKey
-from outbox.models.message import Message
-from outbox.services.attachment_service import save_attachment
+from outbox.models.attachment import Attachment
+from outbox.models.message import Message, MessageSummary
+from outbox.services.attachment_service import Blob, store_blobs
+from outbox.web_utils import clamp_int
 
 bp = Blueprint("api", __name__, url_prefix="/api/v1")
 
 
+def _json_response(payload: Any, status: int = 200) -> Response:
+    """Serialize a payload with orjson into a JSON response."""
+    return Response(orjson.dumps(payload), status=status, mimetype="application/json")
+
+
 def api_key_required(f: Callable[..., Any]) -> Callable[..., Any]:
     """Decorator: require valid API key in X-API-Key header."""
 
@@ -24,11 +34,11 @@ def api_key_required(f: Callable[..., Any]) -> Callable[..., Any]:
     def decorated(*args: Any, **kwargs: Any) -> Any:
         raw_key = request.headers.get("X-API-Key", "")
         if not raw_key:
-            return jsonify({"error": "Missing X-API-Key header"}), 401
+            return _json_response({"error": "Missing X-API-Key header"}, 401)
 
         api_key = ApiKey.verify(raw_key)
         if api_key is None:
-            return jsonify({"error": "Invalid or disabled API key"}), 401
+            return _json_response({"error": "Invalid or disabled API key"}, 401)
 
         g.api_key = api_key
         return f(*args, **kwargs)
@@ -36,92 +46,208 @@ def api_key_required(f: Callable[..., Any]) -> Callable[..., Any]:
     return decorated
 
 
-def _audit_log(action: str, target: str | None = None, details: str | None = None) -> None:
-    from datetime import UTC, datetime
+# Upper bound on messages accepted by one batch request
+_MAX_BATCH_SIZE = 500
 
-    db = get_db()
-    now = datetime.now(UTC).isoformat()
-    actor = f"api_key:{g.api_key.id}" if hasattr(g, "api_key") else None
-    db.execute(
-        "INSERT INTO audit_log (timestamp, actor, action, target, details) VALUES (?, ?, ?, ?, ?)",
-        (now, actor, action, target, details),
-    )
+_AttachmentData = tuple[str, str, Blob]
 
+# Characters a2b_base64 skips that clients commonly wrap or indent base64 with
+_B64_WHITESPACE = ("\n", "\r", " ", "\t")
 
-@bp.route("/messages", methods=["POST"])
-@api_key_required
-def submit_message() -> Response | tuple[Response, int]:
-    """Submit a new message to the queue."""
-    data = request.get_json(silent=True)
-    if not data:
-        return jsonify({"error": "Invalid JSON body"}), 400
+
+class _InvalidMessage(ValueError):
+    """A submitted message failed validation; carries the HTTP status to return."""
+
+    def __init__(self, error: str, status: int = 400) -> None:
+        super().__init__(error)
+        self.status = status
+
+
+def _too_large(filename: str, max_size_mb: int) -> _InvalidMessage:
+    return _InvalidMessage(f"Attachment '{filename}' too large (max {max_size_mb} MB)", 413)
+
+
+def _parse_message(data: Any) -> tuple[dict[str, Any], list[_AttachmentData]]:
+    """Validate one message payload.
+
+    Returns Message.create() keyword arguments and the decoded base64
+    attachments. Raises _InvalidMessage before anything is written.
+    """
+    if not data or not isinstance(data, dict):
+        raise _InvalidMessage("Invalid JSON body")
 
     from_address = data.get("from_address", "").strip()
     to = data.get("to")
-    subject = data.get("subject", "")
-    body = data.get("body", "")
     body_type = data.get("body_type", "plain")
-    delivery_type = data.get("delivery_type", "email")
-    cc = data.get("cc")
-    bcc = data.get("bcc")
-    source_app = data.get("source_app")
-    attachments_data = data.get("attachments", [])
 
     if not from_address:
-        return jsonify({"error": "from_address is required"}), 400
+        raise _InvalidMessage("from_address is required")
     if not to or not isinstance(to, list) or len(to) == 0:
-        return jsonify({"error": "to must be a non-empty list of email addresses"}), 400
+        raise _InvalidMessage("to must be a non-empty list of email addresses")
     if body_type not in ("plain", "html", "markdown"):
-        return jsonify({"error": "body_type must be plain, html, or markdown"}), 400
-
-    message = Message.create(
-        from_address=from_address,
-        to_recipients=to,
-        subject=subject,
-        body=body,
-        body_type=body_type,
-        delivery_type=delivery_type,
-        cc_recipients=cc if cc else None,
-        bcc_recipients=bcc if bcc else None,
-        source_app=source_app,
-        source_api_key_id=g.api_key.id,
-    )
+        raise _InvalidMessage("body_type must be plain, html, or markdown")
+
+    fields = {
+        "from_address": from_address,
+        "to_recipients": to,
+        "subject": data.get("subject", ""),
+        "body": data.get("body", ""),
+        "body_type": body_type,
+        "delivery_type": data.get("delivery_type", "email"),
+        "cc_recipients": data.get("cc") or None,
+        "bcc_recipients": data.get("bcc") or None,
+        "source_app": data.get("source_app"),
+        "source_api_key_id": g.api_key.id,
+    }
 
-    # Handle attachments
-    for att_data in attachments_data:
+    max_size_mb = current_app.config["BLOB_MAX_SIZE_MB"]
+    max_bytes = max_size_mb * 1024 * 1024
+    attachments: list[_AttachmentData] = []
+    for att_data in data.get("attachments", []):
         filename = att_data.get("filename", "attachment")
         content_type = att_data.get("content_type", "application/octet-stream")
         content_b64 = att_data.get("content_base64", "")
         if content_b64:
+            if not isinstance(content_b64, str):
+                raise _InvalidMessage(f"Invalid base64 in attachment '{filename}'")
+            # Reject oversized payloads from the encoded length, before decoding;
+            # line breaks and other whitespace in wrapped base64 carry no data
+            encoded_len = len(content_b64) - sum(map(content_b64.count, _B64_WHITESPACE))
+            padding = content_b64[-8:].rstrip().count("=", -2)
+            if encoded_len * 3 // 4 - padding > max_bytes:
+                raise _too_large(filename, max_size_mb)
             try:
-                raw_data = base64.b64decode(content_b64)
-            except Exception:
-                return jsonify({"error": f"Invalid base64 in attachment '{filename}'"}), 400
-            try:
-                save_attachment(message.id, filename, content_type, raw_data)
-            except ValueError as e:
-                return jsonify({"error": str(e)}), 400
+                raw_data = binascii.a2b_base64(content_b64)
+            except ValueError, TypeError:
+                raise _InvalidMessage(f"Invalid base64 in attachment '{filename}'") from None
+            # Exact check: non-strict decoding also skips other stray characters
+            if len(raw_data) > max_bytes:
+                raise _too_large(filename, max_size_mb)
+            attachments.append((filename, content_type, raw_data))
+    return fields, attachments
+
+
+def _create_submitted(
+    fields_list: list[dict[str, Any]], attachments_list: list[list[_AttachmentData]]
+) -> list[Message]:
+    """Store attachment blobs, then create the messages and their attachment rows.
+
+    Blobs are content-addressed files and are written first; the messages and
+    attachment rows (and the audit entries) are then inserted in one
+    transaction, so no message is queued, and visible to the worker, without
+    its attachments. Raises
+    ValueError for an oversized attachment before anything is written.
+    """
+    rows_list = [store_blobs(items) if items else [] for items in attachments_list]
+
+    with transaction() as cursor:
+        messages = Message.create_many(fields_list, cursor)
+        for message, rows in zip(messages, rows_list, strict=True):
+            Attachment.create_many(message.id, rows, cursor)
+            audit.log(
+                "message_submitted",
+                message.uuid,
+                json.dumps({"to": message.to_list(), "subject": message.subject}),
+            )
+        audit.write_queued(cursor)
+    return messages
+
+
+def _submitted_dict(message: Message) -> dict[str, Any]:
+    return {"uuid": message.uuid, "status": message.status, "created_at": message.created_at}
 
-    _audit_log("message_submitted", message.uuid, json.dumps({"to": to, "subject": subject}))
 
-    return jsonify(
-        {
-            "uuid": message.uuid,
-            "status": message.status,
-            "created_at": message.created_at,
-        }
-    ), 201
+@bp.route("/messages", methods=["POST"])
+@api_key_required
+def submit_message() -> Response:
+    """Submit a new message to the queue.
+
+    Accepts a JSON body with base64 attachments, or multipart/form-data with
+    the message JSON in a ``json`` field and raw ``attachments`` file parts.
+    """
+    is_multipart = request.mimetype == "multipart/form-data"
+    try:
+        if is_multipart:
+            data = orjson.loads(request.form.get("json") or "null")
+        else:
+            data = orjson.loads(request.get_data(cache=False) or b"null")
+    except orjson.JSONDecodeError:
+        data = None
+
+    try:
+        fields, attachments = _parse_message(data)
+    except _InvalidMessage as e:
+        return _json_response({"error": str(e)}, e.status)
+
+    if is_multipart:
+        max_size_mb = current_app.config["BLOB_MAX_SIZE_MB"]
+        max_bytes = max_size_mb * 1024 * 1024
+        for part in request.files.getlist("attachments"):
+            filename = part.filename or "attachment"
+            # Werkzeug has already spooled the part; measure it without reading it
+            stream = part.stream
+            size = stream.seek(0, os.SEEK_END)
+            stream.seek(0)
+            if size > max_bytes:
+                return _json_response(
+                    {"error": f"Attachment '{filename}' too large (max {max_size_mb} MB)"}, 413
+                )
+            content_type = part.mimetype or "application/octet-stream"
+            attachments.append((filename, content_type, stream))
+
+    try:
+        (message,) = _create_submitted([fields], [attachments])
+    except ValueError as e:
+        return _json_response({"error": str(e)}, 400)
+
+    return _json_response(_submitted_dict(message), 201)
+
+
+@bp.route("/messages/batch", methods=["POST"])
+@api_key_required
+def submit_messages() -> Response:
+    """Submit several messages in one request and one transaction.
+
+    The body is ``{"messages": [...]}``, each item shaped like the JSON body of
+    ``POST /messages``. Every item is validated before any message is created.
+    """
+    try:
+        data = orjson.loads(request.get_data(cache=False) or b"null")
+    except orjson.JSONDecodeError:
+        data = None
+    items = data.get("messages") if isinstance(data, dict) else None
+    if not items or not isinstance(items, list):
+        return _json_response({"error": "messages must be a non-empty list"}, 400)
+    if len(items) > _MAX_BATCH_SIZE:
+        return _json_response({"error": f"At most {_MAX_BATCH_SIZE} messages per batch"}, 400)
+
+    fields_list = []
+    attachments_list = []
+    for i, item in enumerate(items):
+        try:
+            fields, attachments = _parse_message(item)
+        except _InvalidMessage as e:
+            return _json_response({"error": f"messages[{i}]: {e}"}, e.status)
+        fields_list.append(fields)
+        attachments_list.append(attachments)
+
+    try:
+        messages = _create_submitted(fields_list, attachments_list)
+    except ValueError as e:
+        return _json_response({"error": str(e)}, 400)
+
+    return _json_response({"messages": [_submitted_dict(m) for m in messages]}, 201)
 
 
 @bp.route("/messages/<msg_uuid>")
 @api_key_required
-def get_message(msg_uuid: str) -> Response | tuple[Response, int]:
+def get_message(msg_uuid: str) -> Response:
     """Get a message by UUID."""
     message = Message.get_by_uuid(msg_uuid)
     if message is None:
-        return jsonify({"error": "Message not found"}), 404
+        return _json_response({"error": "Message not found"}, 404)
 
-    return jsonify(_message_to_dict(message))
+    return _json_response(_message_to_dict(message))
 
 
 @bp.route("/messages")
@@ -130,13 +256,13 @@ def list_messages() -> Response:
     """List messages with optional filtering."""
     status = request.args.get("status")
     search = request.args.get("search")
-    limit = min(int(request.args.get("limit", 50)), 200)
-    offset = int(request.args.get("offset", 0))
+    limit = clamp_int("limit", 50, 1, 200)
+    offset = clamp_int("offset", 0, 0, 10_000_000)
 
     messages = Message.list_messages(status=status, search=search, limit=limit, offset=offset)
     total = Message.count(status=status)
 
-    return jsonify(
+    return _json_response(
         {
             "messages": [_message_to_dict(m) for m in messages],
             "total": total,
@@ -148,42 +274,44 @@ def list_messages() -> Response:
 
 @bp.route("/messages/<msg_uuid>/retry", methods=["POST"])
 @api_key_required
-def retry_message(msg_uuid: str) -> Response | tuple[Response, int]:
+def retry_message(msg_uuid: str) -> Response:
     """Retry a failed/dead message."""
     message = Message.get_by_uuid(msg_uuid)
     if message is None:
-        return jsonify({"error": "Message not found"}), 404
+        return _json_response({"error": "Message not found"}, 404)
 
     if message.status not in ("failed", "dead"):
-        return jsonify({"error": f"Cannot retry message with status '{message.status}'"}), 400
-
-    from flask import current_app
+        return _json_response(
+            {"error": f"Cannot retry message with status '{message.status}'"}, 400
+        )
 
     message.retries_remaining = current_app.config["QUEUE_MAX_RETRIES"]
     message.update_status("queued")
-    _audit_log("message_retried", msg_uuid)
+    audit.log("message_retried", msg_uuid)
 
-    return jsonify({"uuid": message.uuid, "status": message.status})
+    return _json_response({"uuid": message.uuid, "status": message.status})
 
 
 @bp.route("/messages/<msg_uuid>/cancel", methods=["POST"])
 @api_key_required
-def cancel_message(msg_uuid: str) -> Response | tuple[Response, int]:
+def cancel_message(msg_uuid: str) -> Response:
     """Cancel a queued message."""
     message = Message.get_by_uuid(msg_uuid)
     if message is None:
-        return jsonify({"error": "Message not found"}), 404
+        return _json_response({"error": "Message not found"}, 404)
 
     if message.status != "queued":
-        return jsonify({"error": f"Cannot cancel message with status '{message.status}'"}), 400
+        return _json_response(
+            {"error": f"Cannot cancel message with status '{message.status}'"}, 400
+        )
 
     message.update_status("cancelled")
-    _audit_log("message_cancelled", msg_uuid)
+    audit.log("message_cancelled", msg_uuid)
 
-    return jsonify({"uuid": message.uuid, "status": message.status})
+    return _json_response({"uuid": message.uuid, "status": message.status})
 
 
-def _message_to_dict(message: Message) -> dict[str, Any]:
+def _message_to_dict(message: Message | MessageSummary) -> dict[str, Any]:
     return {
         "uuid": message.uuid,
         "status": message.status,
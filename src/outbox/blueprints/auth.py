@@ -29,8 +29,19 @@ def _get_gk() -> Any:
     return current_app.config.get("GATEKEEPER_CLIENT")
 
 
-def _is_htmx() -> bool:
-    return request.headers.get("HX-Request") == "true"
+def _unauthenticated() -> Response | tuple[str, int]:
+    """Response for a request without a logged-in user."""
+    if g.is_htmx:
+        return "", 401
+    return redirect(url_for("auth.login", next=request.url))
+
+
+def _is_admin() -> bool:
+    """Whether the current user is in the admin group (resolved once per request)."""
+    is_admin = g.get("user_is_admin")
+    if is_admin is None:
+        is_admin = g.user_is_admin = g.user.in_group("admin")
+    return is_admin
 
 
 def login_required(f: Callable[..., Any]) -> Callable[..., Any]:
@@ -39,9 +50,7 @@ def login_required(f: Callable[..., Any]) -> Callable[..., Any]:
     @wraps(f)
     def decorated(*args: Any, **kwargs: Any) -> Any:
         if g.get("user") is None:
-            if _is_htmx():
-                return "", 401
-            return redirect(url_for("auth.login", next=request.url))
+            return _unauthenticated()
         return f(*args, **kwargs)
 
     return decorated
@@ -53,10 +62,8 @@ def admin_required(f: Callable[..., Any]) -> Callable[..., Any]:
     @wraps(f)
     def decorated(*args: Any, **kwargs: Any) -> Any:
         if g.get("user") is None:
-            if _is_htmx():
-                return "", 401
-            return redirect(url_for("auth.login", next=request.url))
-        if not g.user.in_group("admin"):
+            return _unauthenticated()
+        if not _is_admin():
             abort(403)
         return f(*args, **kwargs)
 
@@ -1,6 +1,5 @@
 """CLI entry point for outbox-admin."""
 
-import configparser
 import os
 import stat
 import sys
@@ -12,6 +11,8 @@ from flask import Flask
 from outbox.config import (
     INI_MAP,
     REGISTRY,
+    REGISTRY_BY_GROUP,
+    parse_ini,
     parse_value,
     resolve_entry,
     serialize_value,
@@ -47,8 +48,9 @@ def _db_get(key: str) -> str | None:
 def _db_get_all() -> dict[str, str]:
     """Read all app_setting rows into a dict."""
     db = get_standalone_db()
-    rows = db.execute("SELECT key, value FROM app_setting ORDER BY key").fetchall()
-    return {str(r[0]): str(r[1]) for r in rows}
+    return {
+        str(r[0]): str(r[1]) for r in db.execute("SELECT key, value FROM app_setting ORDER BY key")
+    }
 
 
 def _db_set(key: str, value: str) -> None:
@@ -83,33 +85,35 @@ def config() -> None:
 def config_list() -> None:
     """Show all settings with their effective values."""
     db_values = _db_get_all()
-
-    current_group = ""
-    for entry in REGISTRY:
-        group = entry.key.split(".")[0]
-        if group != current_group:
-            if current_group:
-                click.echo()
-            click.echo(click.style(f"[{group}]", bold=True))
-            current_group = group
-
-        raw = db_values.get(entry.key)
-        if raw is not None:
-            value = raw
-            source = "db"
-        else:
-            value = serialize_value(entry, entry.default)
-            source = "default"
-
-        if entry.secret and raw is not None:
-            display = "********"
-        else:
-            display = value if value else "(empty)"
-
-        source_tag = click.style(f"[{source}]", fg="cyan" if source == "db" else "yellow")
-        click.echo(f"  {entry.key} = {display}  {source_tag}")
-        click.echo(click.style(f"    {entry.description}", dim=True))
-
+    source_tags = {
+        "db": click.style("[db]", fg="cyan"),
+        "default": click.style("[default]", fg="yellow"),
+    }
+
+    # Collect every line and write once instead of echoing per setting
+    lines: list[str] = []
+    for group, entries in REGISTRY_BY_GROUP.items():
+        if lines:
+            lines.append("")
+        lines.append(click.style(f"[{group}]", bold=True))
+        for entry in entries:
+            raw = db_values.get(entry.key)
+            if raw is not None:
+                value = raw
+                source = "db"
+            else:
+                value = serialize_value(entry, entry.default)
+                source = "default"
+
+            if entry.secret and raw is not None:
+                display = "********"
+            else:
+                display = value if value else "(empty)"
+
+            lines.append(f"  {entry.key} = {display}  {source_tags[source]}")
+            lines.append(click.style(f"    {entry.description}", dim=True))
+
+    click.echo("\n".join(lines))
     close_standalone_db()
 
 
@@ -197,16 +201,15 @@ def config_export(output_file: str) -> None:
 @click.argument("ini_file", type=click.Path(exists=True))
 def config_import(ini_file: str) -> None:
     """Import settings from an INI config file."""
-    cfg = configparser.ConfigParser()
-    cfg.read(ini_file)
+    try:
+        parsed = parse_ini(ini_file)
+    except ValueError as exc:
+        click.echo(f"Invalid INI file: {exc}", err=True)
+        sys.exit(1)
 
     imported = 0
-
-    for section in cfg.sections():
-        for ini_key, value in cfg.items(section):
-            # Skip configparser's DEFAULT entries
-            if ini_key == "__name__":
-                continue
+    for section, values in parsed.items():
+        for ini_key, value in values.items():
             lookup = (section, ini_key.upper())
             registry_key = INI_MAP.get(lookup)
             if registry_key is None:
@@ -0,0 +1,124 @@
+"""Async HTTP API backend for AsyncOutboxClient (remote server)."""
+
+import asyncio
+from collections.abc import Sequence
+
+import httpx
+import orjson
+
+from outbox.client.backends.http import (
+    _ACCEPT,
+    _decode,
+    _message_payload,
+    _multipart_fields,
+    _result_from_json,
+)
+from outbox.client.models import Message, MessageResult
+
+
+class AsyncHttpBackend:
+    """Async backend that communicates with a remote Outbox server via JSON API.
+
+    Requests share one httpx.AsyncClient connection pool, so callers can fan
+    out with asyncio.gather(). Call aclose() (or use ``async with``) to release it.
+    ``http2=True`` multiplexes those requests over one connection; it requires
+    the ``http2`` extra and raises ImportError without it (see HttpBackend).
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        api_key: str,
+        timeout: float = 30.0,
+        legacy: bool = False,
+        http2: bool = False,
+    ) -> None:
+        self.server_url = server_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.legacy = legacy
+        self._client = httpx.AsyncClient(
+            base_url=self.server_url,
+            headers={"X-API-Key": self.api_key, "Accept": _ACCEPT},
+            timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(max_connections=100, keepalive_expiry=30),
+        )
+        self._batch_supported = True
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> AsyncHttpBackend:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def _post_json(self, path: str, payload: dict) -> httpx.Response:
+        return await self._client.post(
+            path, content=orjson.dumps(payload), headers={"Content-Type": "application/json"}
+        )
+
+    async def submit_message(self, message: Message) -> MessageResult:
+        if message.attachments and not self.legacy:
+            fields, files = _multipart_fields(message)
+            resp = await self._client.post("/api/v1/messages", data=fields, files=files)
+        else:
+            resp = await self._post_json("/api/v1/messages", _message_payload(message))
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
+
+    async def submit_messages(self, messages: Sequence[Message]) -> list[MessageResult]:
+        """Submit several messages in one request.
+
+        Falls back to concurrent single submissions if the server has no batch endpoint.
+        """
+        # The batch endpoint is JSON-only, so raw attachment uploads go one by one
+        if self._batch_supported and (self.legacy or not any(m.attachments for m in messages)):
+            resp = await self._post_json(
+                "/api/v1/messages/batch",
+                {"messages": [_message_payload(m) for m in messages]},
+            )
+            if resp.status_code not in (404, 405):
+                resp.raise_for_status()
+                return [_result_from_json(m) for m in _decode(resp)["messages"]]
+            self._batch_supported = False
+        return list(await asyncio.gather(*(self.submit_message(m) for m in messages)))
+
+    async def get_status(self, uuid: str) -> MessageResult | None:
+        resp = await self._client.get(f"/api/v1/messages/{uuid}")
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
+
+    async def list_messages(
+        self,
+        status: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list[MessageResult]:
+        params: dict = {"limit": limit, "offset": offset}
+        if status:
+            params["status"] = status
+
+        resp = await self._client.get("/api/v1/messages", params=params)
+        resp.raise_for_status()
+        data = _decode(resp)
+        return [_result_from_json(m) for m in data.get("messages", [])]
+
+    async def retry_message(self, uuid: str) -> MessageResult | None:
+        resp = await self._client.post(f"/api/v1/messages/{uuid}/retry")
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
+
+    async def cancel_message(self, uuid: str) -> MessageResult | None:
+        resp = await self._client.post(f"/api/v1/messages/{uuid}/cancel")
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
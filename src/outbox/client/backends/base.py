@@ -1,5 +1,6 @@
 """Abstract backend protocol for OutboxClient."""
 
+from collections.abc import Sequence
 from typing import Protocol
 
 from outbox.client.models import Message, MessageResult
@@ -12,6 +13,10 @@ class OutboxBackend(Protocol):
         """Submit a message to the queue."""
         ...
 
+    def submit_messages(self, messages: Sequence[Message]) -> list[MessageResult]:
+        """Submit several messages to the queue in one batch."""
+        ...
+
     def get_status(self, uuid: str) -> MessageResult | None:
         """Get the status of a message by UUID."""
         ...
@@ -32,3 +37,44 @@ class OutboxBackend(Protocol):
     def cancel_message(self, uuid: str) -> MessageResult | None:
         """Cancel a queued message."""
         ...
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+        ...
+
+
+class AsyncOutboxBackend(Protocol):
+    """Protocol that all async backends must implement."""
+
+    async def submit_message(self, message: Message) -> MessageResult:
+        """Submit a message to the queue."""
+        ...
+
+    async def submit_messages(self, messages: Sequence[Message]) -> list[MessageResult]:
+        """Submit several messages to the queue in one batch."""
+        ...
+
+    async def get_status(self, uuid: str) -> MessageResult | None:
+        """Get the status of a message by UUID."""
+        ...
+
+    async def list_messages(
+        self,
+        status: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list[MessageResult]:
+        """List messages with optional filtering."""
+        ...
+
+    async def retry_message(self, uuid: str) -> MessageResult | None:
+        """Retry a failed/dead message."""
+        ...
+
+    async def cancel_message(self, uuid: str) -> MessageResult | None:
+        """Cancel a queued message."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release any resources held by the backend."""
+        ...
@@ -1,77 +1,165 @@
 """HTTP API backend for OutboxClient (remote server)."""
 
-import base64
+import binascii
+from collections.abc import Sequence
+from typing import Any
 
 import httpx
+import orjson
 
 from outbox.client.models import Message, MessageResult
 
+try:
+    import msgpack
+except ImportError:  # optional: only used when installed and the server offers it
+    msgpack = None
+
+
+# Ask for msgpack only when we can decode it; JSON stays acceptable either way
+_ACCEPT = "application/msgpack, application/json;q=0.9" if msgpack else "application/json"
+
+
+def _decode(resp: httpx.Response) -> Any:
+    """Decode a response body as msgpack or JSON according to its content type."""
+    if msgpack is not None and resp.headers.get("content-type", "").startswith(
+        "application/msgpack"
+    ):
+        return msgpack.unpackb(resp.content, raw=False)
+    return orjson.loads(resp.content)
+
+
+def _message_payload(message: Message, inline_attachments: bool = True) -> dict:
+    """Build the JSON message body; attachments are base64-inlined only if asked."""
+    payload: dict = {
+        "from_address": message.from_address,
+        "to": message.to,
+        "subject": message.subject,
+        "body": message.body,
+        "body_type": message.body_type,
+        "delivery_type": message.delivery_type,
+    }
+    if message.cc:
+        payload["cc"] = message.cc
+    if message.bcc:
+        payload["bcc"] = message.bcc
+    if message.source_app:
+        payload["source_app"] = message.source_app
+    if inline_attachments and message.attachments:
+        payload["attachments"] = [
+            {
+                "filename": att.filename,
+                "content_type": att.content_type,
+                "content_base64": binascii.b2a_base64(att.data, newline=False).decode("ascii"),
+            }
+            for att in message.attachments
+        ]
+    return payload
+
+
+def _multipart_fields(message: Message) -> tuple[dict, list]:
+    """Split a message into the form field and raw file parts for a multipart upload."""
+    payload = _message_payload(message, inline_attachments=False)
+    files = [
+        ("attachments", (att.filename, att.data, att.content_type)) for att in message.attachments
+    ]
+    return {"json": orjson.dumps(payload).decode()}, files
+
+
+def _result_from_json(data: dict) -> MessageResult:
+    return MessageResult(
+        uuid=data["uuid"],
+        status=data["status"],
+        created_at=data.get("created_at"),
+        updated_at=data.get("updated_at"),
+        sent_at=data.get("sent_at"),
+        last_error=data.get("last_error"),
+    )
+
 
 class HttpBackend:
-    """Backend that communicates with a remote Outbox server via JSON API."""
+    """Backend that communicates with a remote Outbox server via JSON API.
+
+    A single httpx.Client is kept for the backend's lifetime so keep-alive
+    connections are reused across calls; it is safe to share between threads.
+    Call close() (or use the backend as a context manager) to release it.
 
-    def __init__(self, server_url: str, api_key: str, timeout: float = 30.0) -> None:
+    Attachments are uploaded as raw multipart file parts. Pass ``legacy=True``
+    to send them base64-encoded inside the JSON body for older servers.
+
+    ``http2=True`` multiplexes concurrent requests over one connection. It
+    requires the ``http2`` extra (the ``h2`` package): without it,
+    constructing the backend raises ImportError. With it installed, httpx
+    still stays on HTTP/1.1 unless the TLS server negotiates h2 via ALPN.
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        api_key: str,
+        timeout: float = 30.0,
+        legacy: bool = False,
+        http2: bool = False,
+    ) -> None:
         self.server_url = server_url.rstrip("/")
         self.api_key = api_key
         self.timeout = timeout
-
-    def _client(self) -> httpx.Client:
-        return httpx.Client(
+        self.legacy = legacy
+        self._client = httpx.Client(
             base_url=self.server_url,
-            headers={"X-API-Key": self.api_key},
+            headers={"X-API-Key": self.api_key, "Accept": _ACCEPT},
             timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30),
+        )
+        self._batch_supported = True
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        self._client.close()
+
+    def __enter__(self) -> HttpBackend:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _post_json(self, path: str, payload: dict) -> httpx.Response:
+        return self._client.post(
+            path, content=orjson.dumps(payload), headers={"Content-Type": "application/json"}
         )
 
     def submit_message(self, message: Message) -> MessageResult:
-        payload: dict = {
-            "from_address": message.from_address,
-            "to": message.to,
-            "subject": message.subject,
-            "body": message.body,
-            "body_type": message.body_type,
-            "delivery_type": message.delivery_type,
-        }
-        if message.cc:
-            payload["cc"] = message.cc
-        if message.bcc:
-            payload["bcc"] = message.bcc
-        if message.source_app:
-            payload["source_app"] = message.source_app
-        if message.attachments:
-            payload["attachments"] = [
-                {
-                    "filename": att.filename,
-                    "content_type": att.content_type,
-                    "content_base64": base64.b64encode(att.data).decode("ascii"),
-                }
-                for att in message.attachments
-            ]
-
-        with self._client() as client:
-            resp = client.post("/api/v1/messages", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            return MessageResult(
-                uuid=data["uuid"],
-                status=data["status"],
-                created_at=data.get("created_at"),
+        if message.attachments and not self.legacy:
+            fields, files = _multipart_fields(message)
+            resp = self._client.post("/api/v1/messages", data=fields, files=files)
+        else:
+            resp = self._post_json("/api/v1/messages", _message_payload(message))
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
+
+    def submit_messages(self, messages: Sequence[Message]) -> list[MessageResult]:
+        """Submit several messages in one request.
+
+        Falls back to one request per message if the server has no batch endpoint.
+        """
+        # The batch endpoint is JSON-only, so raw attachment uploads go one by one
+        if self._batch_supported and (self.legacy or not any(m.attachments for m in messages)):
+            resp = self._post_json(
+                "/api/v1/messages/batch",
+                {"messages": [_message_payload(m) for m in messages]},
             )
+            if resp.status_code not in (404, 405):
+                resp.raise_for_status()
+                return [_result_from_json(m) for m in _decode(resp)["messages"]]
+            self._batch_supported = False
+        return [self.submit_message(m) for m in messages]
 
     def get_status(self, uuid: str) -> MessageResult | None:
-        with self._client() as client:
-            resp = client.get(f"/api/v1/messages/{uuid}")
-            if resp.status_code == 404:
-                return None
-            resp.raise_for_status()
-            data = resp.json()
-            return MessageResult(
-                uuid=data["uuid"],
-                status=data["status"],
-                created_at=data.get("created_at"),
-                updated_at=data.get("updated_at"),
-                sent_at=data.get("sent_at"),
-                last_error=data.get("last_error"),
-            )
+        resp = self._client.get(f"/api/v1/messages/{uuid}")
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
 
     def list_messages(
         self,
@@ -83,36 +171,21 @@ class HttpBackend:
         if status:
             params["status"] = status
 
-        with self._client() as client:
-            resp = client.get("/api/v1/messages", params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            return [
-                MessageResult(
-                    uuid=m["uuid"],
-                    status=m["status"],
-                    created_at=m.get("created_at"),
-                    updated_at=m.get("updated_at"),
-                    sent_at=m.get("sent_at"),
-                    last_error=m.get("last_error"),
-                )
-                for m in data.get("messages", [])
-            ]
+        resp = self._client.get("/api/v1/messages", params=params)
+        resp.raise_for_status()
+        data = _decode(resp)
+        return [_result_from_json(m) for m in data.get("messages", [])]
 
     def retry_message(self, uuid: str) -> MessageResult | None:
-        with self._client() as client:
-            resp = client.post(f"/api/v1/messages/{uuid}/retry")
-            if resp.status_code == 404:
-                return None
-            resp.raise_for_status()
-            data = resp.json()
-            return MessageResult(uuid=data["uuid"], status=data["status"])
+        resp = self._client.post(f"/api/v1/messages/{uuid}/retry")
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
 
     def cancel_message(self, uuid: str) -> MessageResult | None:
-        with self._client() as client:
-            resp = client.post(f"/api/v1/messages/{uuid}/cancel")
-            if resp.status_code == 404:
-                return None
-            resp.raise_for_status()
-            data = resp.json()
-            return MessageResult(uuid=data["uuid"], status=data["status"])
+        resp = self._client.post(f"/api/v1/messages/{uuid}/cancel")
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return _result_from_json(_decode(resp))
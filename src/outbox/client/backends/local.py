@@ -1,99 +1,133 @@
 """Local SQLite backend for OutboxClient (direct DB insertion)."""
 
-import json
-import uuid as uuid_mod
-from datetime import UTC, datetime
+import os
+import threading
+from collections.abc import Sequence
 from pathlib import Path
 
 import apsw
+import orjson
 
 from outbox.client.models import Message, MessageResult
-
-
-def _opt_str(val: object) -> str | None:
-    return str(val) if val is not None else None
-
-
-def _result_from_row(row: tuple) -> MessageResult:
-    return MessageResult(
-        uuid=str(row[0]),
-        status=str(row[1]),
-        created_at=_opt_str(row[2]),
-        updated_at=_opt_str(row[3]),
-        sent_at=_opt_str(row[4]),
-        last_error=_opt_str(row[5]),
+from outbox.timeutil import utc_now_iso
+
+_INSERT_MESSAGE_SQL = (
+    "INSERT INTO message "
+    "(uuid, status, delivery_type, from_address, to_recipients, cc_recipients, "
+    "bcc_recipients, subject, body, body_type, retries_remaining, "
+    "source_app, created_at, updated_at) "
+    "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?, 5, ?, ?, ?)"
+)
+# Same order as the MessageResult fields, so rows unpack straight into it
+_RESULT_COLUMNS = "uuid, status, created_at, updated_at, sent_at, last_error"
+_SELECT_RESULT_SQL = f"SELECT {_RESULT_COLUMNS} FROM message WHERE uuid = ?"
+_LIST_RESULTS_SQL = (
+    f"SELECT {_RESULT_COLUMNS} FROM message ORDER BY created_at DESC LIMIT ? OFFSET ?"
+)
+_LIST_RESULTS_BY_STATUS_SQL = (
+    f"SELECT {_RESULT_COLUMNS} FROM message WHERE status = ? "
+    "ORDER BY created_at DESC LIMIT ? OFFSET ?"
+)
+_SELECT_STATUS_SQL = "SELECT status FROM message WHERE uuid = ?"
+_RETRY_SQL = (
+    "UPDATE message SET status = 'queued', retries_remaining = 5, "
+    "next_retry_at = NULL, updated_at = ? "
+    "WHERE uuid = ? AND status IN ('failed', 'dead')"
+)
+_CANCEL_SQL = (
+    "UPDATE message SET status = 'cancelled', updated_at = ? WHERE uuid = ? AND status = 'queued'"
+)
+
+
+# Maps a random hex digit onto the RFC 4122 variant digits (binary 10xx)
+_VARIANT_DIGIT = {c: "89ab"[int(c, 16) & 0x3] for c in "0123456789abcdef"}
+
+
+def _uuid4_strs(count: int) -> list[str]:
+    """Generate random version-4 UUID strings from a single urandom call.
+
+    Equivalent to str(uuid.uuid4()) but without building a UUID object per id.
+    """
+    raw = os.urandom(16 * count).hex()
+    result = []
+    for i in range(0, 32 * count, 32):
+        h = raw[i : i + 32]
+        result.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{_VARIANT_DIGIT[h[16]]}{h[17:20]}-{h[20:]}")
+    return result
+
+
+def _message_row(msg_uuid: str, message: Message, now: str) -> tuple:
+    return (
+        msg_uuid,
+        message.delivery_type,
+        message.from_address,
+        orjson.dumps(message.to).decode(),
+        orjson.dumps(message.cc).decode() if message.cc else None,
+        orjson.dumps(message.bcc).decode() if message.bcc else None,
+        message.subject,
+        message.body,
+        message.body_type,
+        message.source_app,
+        now,
+        now,
     )
 
 
 class LocalBackend:
-    """Backend that inserts directly into the Outbox SQLite database."""
+    """Backend that inserts directly into the Outbox SQLite database.
+
+    One connection is opened on first use and reused for every call; a lock
+    keeps calls from different threads from interleaving their transactions.
+    """
 
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
+        self._conn: apsw.Connection | None = None
+        self._lock = threading.Lock()
 
     def _connect(self) -> apsw.Connection:
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        conn = apsw.Connection(self.db_path)
-        conn.execute("PRAGMA busy_timeout = 5000;")
-        conn.execute("PRAGMA foreign_keys = ON;")
-        conn.execute("PRAGMA journal_mode = WAL;")
-        return conn
+        """Return the shared connection, opening it on first use (call with the lock held)."""
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = apsw.Connection(self.db_path)
+            conn.setbusytimeout(5000)
+            # One multi-statement call; drain it so every PRAGMA actually runs
+            for _ in conn.execute("PRAGMA foreign_keys = ON; PRAGMA journal_mode = WAL;"):
+                pass
+            self._conn = conn
+        return self._conn
 
     def submit_message(self, message: Message) -> MessageResult:
-        msg_uuid = str(uuid_mod.uuid4())
-        now = datetime.now(UTC).isoformat()
-        to_json = json.dumps(message.to)
-        cc_json = json.dumps(message.cc) if message.cc else None
-        bcc_json = json.dumps(message.bcc) if message.bcc else None
-
-        conn = self._connect()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("BEGIN IMMEDIATE;")
-            try:
-                cursor.execute(
-                    "INSERT INTO message "
-                    "(uuid, status, delivery_type, from_address, to_recipients, cc_recipients, "
-                    "bcc_recipients, subject, body, body_type, retries_remaining, "
-                    "source_app, created_at, updated_at) "
-                    "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?, 5, ?, ?, ?)",
-                    (
-                        msg_uuid,
-                        message.delivery_type,
-                        message.from_address,
-                        to_json,
-                        cc_json,
-                        bcc_json,
-                        message.subject,
-                        message.body,
-                        message.body_type,
-                        message.source_app,
-                        now,
-                        now,
-                    ),
-                )
-                cursor.execute("COMMIT;")
-            except Exception:
-                cursor.execute("ROLLBACK;")
-                raise
-        finally:
-            conn.close()
+        msg_uuid = _uuid4_strs(1)[0]
+        now = utc_now_iso()
+        row = _message_row(msg_uuid, message, now)
+
+        # A single INSERT commits atomically on its own; no explicit transaction needed
+        with self._lock:
+            self._connect().execute(_INSERT_MESSAGE_SQL, row)
 
         return MessageResult(uuid=msg_uuid, status="queued", created_at=now)
 
+    def submit_messages(self, messages: Sequence[Message]) -> list[MessageResult]:
+        """Insert several messages with one prepared statement in one transaction."""
+        now = utc_now_iso()
+        uuids = _uuid4_strs(len(messages))
+        rows = [_message_row(msg_uuid, m, now) for msg_uuid, m in zip(uuids, messages, strict=True)]
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(_INSERT_MESSAGE_SQL, rows)
+
+        return [MessageResult(uuid=msg_uuid, status="queued", created_at=now) for msg_uuid in uuids]
+
     def get_status(self, uuid: str) -> MessageResult | None:
-        conn = self._connect()
-        try:
-            row = conn.execute(
-                "SELECT uuid, status, created_at, updated_at, sent_at, last_error "
-                "FROM message WHERE uuid = ?",
-                (uuid,),
-            ).fetchone()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(_SELECT_RESULT_SQL, (uuid,)).fetchone()
             if row is None:
                 return None
-            return _result_from_row(row)
-        finally:
-            conn.close()
+            return MessageResult(*row)
 
     def list_messages(
         self,
@@ -101,79 +135,36 @@ class LocalBackend:
         limit: int = 50,
         offset: int = 0,
     ) -> list[MessageResult]:
-        conn = self._connect()
-        try:
+        with self._lock:
+            conn = self._connect()
             if status:
-                rows = conn.execute(
-                    "SELECT uuid, status, created_at, updated_at, sent_at, last_error "
-                    "FROM message WHERE status = ? ORDER BY created_at DESC LIMIT ? OFFSET ?",
-                    (status, limit, offset),
-                ).fetchall()
+                cursor = conn.execute(_LIST_RESULTS_BY_STATUS_SQL, (status, limit, offset))
             else:
-                rows = conn.execute(
-                    "SELECT uuid, status, created_at, updated_at, sent_at, last_error "
-                    "FROM message ORDER BY created_at DESC LIMIT ? OFFSET ?",
-                    (limit, offset),
-                ).fetchall()
-            return [_result_from_row(row) for row in rows]
-        finally:
-            conn.close()
+                cursor = conn.execute(_LIST_RESULTS_SQL, (limit, offset))
+            return [MessageResult(*row) for row in cursor]
+
+    def _guarded_update(self, uuid: str, sql: str, new_status: str) -> MessageResult | None:
+        """Run a status-guarded UPDATE; on no match, report the message's current status."""
+        now = utc_now_iso()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(sql, (now, uuid))
+            if conn.changes():
+                return MessageResult(uuid=uuid, status=new_status, updated_at=now)
+            row = conn.execute(_SELECT_STATUS_SQL, (uuid,)).fetchone()
+        if row is None:
+            return None
+        return MessageResult(uuid=uuid, status=row[0])
 
     def retry_message(self, uuid: str) -> MessageResult | None:
-        conn = self._connect()
-        try:
-            now = datetime.now(UTC).isoformat()
-            cursor = conn.cursor()
-            cursor.execute("BEGIN IMMEDIATE;")
-            try:
-                row = cursor.execute(
-                    "SELECT status FROM message WHERE uuid = ?", (uuid,)
-                ).fetchone()
-                if row is None:
-                    cursor.execute("ROLLBACK;")
-                    return None
-                if row[0] not in ("failed", "dead"):
-                    cursor.execute("ROLLBACK;")
-                    return MessageResult(uuid=uuid, status=row[0])
-
-                cursor.execute(
-                    "UPDATE message SET status = 'queued', retries_remaining = 5, "
-                    "next_retry_at = NULL, updated_at = ? WHERE uuid = ?",
-                    (now, uuid),
-                )
-                cursor.execute("COMMIT;")
-            except Exception:
-                cursor.execute("ROLLBACK;")
-                raise
-            return MessageResult(uuid=uuid, status="queued", updated_at=now)
-        finally:
-            conn.close()
+        return self._guarded_update(uuid, _RETRY_SQL, "queued")
 
     def cancel_message(self, uuid: str) -> MessageResult | None:
-        conn = self._connect()
-        try:
-            now = datetime.now(UTC).isoformat()
-            cursor = conn.cursor()
-            cursor.execute("BEGIN IMMEDIATE;")
-            try:
-                row = cursor.execute(
-                    "SELECT status FROM message WHERE uuid = ?", (uuid,)
-                ).fetchone()
-                if row is None:
-                    cursor.execute("ROLLBACK;")
-                    return None
-                if row[0] != "queued":
-                    cursor.execute("ROLLBACK;")
-                    return MessageResult(uuid=uuid, status=row[0])
-
-                cursor.execute(
-                    "UPDATE message SET status = 'cancelled', updated_at = ? WHERE uuid = ?",
-                    (now, uuid),
-                )
-                cursor.execute("COMMIT;")
-            except Exception:
-                cursor.execute("ROLLBACK;")
-                raise
-            return MessageResult(uuid=uuid, status="cancelled", updated_at=now)
-        finally:
-            conn.close()
+        return self._guarded_update(uuid, _CANCEL_SQL, "cancelled")
+
+    def close(self) -> None:
+        """Close the shared connection; it is reopened if the backend is used again."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,5 +1,7 @@
 """OutboxClient facade - unified API for both local and HTTP modes."""
 
+from collections.abc import Sequence
+
 from outbox.client.models import Message, MessageResult
 
 
@@ -8,7 +10,10 @@ class OutboxClient:
 
     Supports two modes:
     - Local mode: direct SQLite insertion (requires apsw)
-    - HTTP mode: remote API calls (requires httpx)
+    - HTTP mode: remote API calls (requires httpx); pass legacy=True to send
+      attachments base64-encoded for servers without multipart support, and
+      http2=True to multiplex requests over one connection (requires the
+      ``http2`` extra; ImportError without it)
 
     Usage:
         # Local mode (same machine, direct DB access)
@@ -27,6 +32,9 @@ class OutboxClient:
 
         # Check status
         status = client.get_status(result.uuid)
+
+        # Release connections when done (or use the client as a context manager)
+        client.close()
     """
 
     def __init__(
@@ -34,6 +42,8 @@ class OutboxClient:
         db_path: str | None = None,
         server_url: str | None = None,
         api_key: str | None = None,
+        legacy: bool = False,
+        http2: bool = False,
     ) -> None:
         if db_path:
             from outbox.client.backends.local import LocalBackend
@@ -43,7 +53,7 @@ class OutboxClient:
         elif server_url and api_key:
             from outbox.client.backends.http import HttpBackend
 
-            self.backend = HttpBackend(server_url, api_key)
+            self.backend = HttpBackend(server_url, api_key, legacy=legacy, http2=http2)
             self.mode = "http"
         else:
             raise ValueError(
@@ -54,6 +64,10 @@ class OutboxClient:
         """Submit a message to the queue."""
         return self.backend.submit_message(message)
 
+    def submit_messages(self, messages: Sequence[Message]) -> list[MessageResult]:
+        """Submit several messages to the queue in one batch."""
+        return self.backend.submit_messages(messages)
+
     def get_status(self, uuid: str) -> MessageResult | None:
         """Get the status of a message by UUID."""
         return self.backend.get_status(uuid)
@@ -74,3 +88,71 @@ class OutboxClient:
     def cancel_message(self, uuid: str) -> MessageResult | None:
         """Cancel a queued message."""
         return self.backend.cancel_message(uuid)
+
+    def close(self) -> None:
+        """Release the backend's connections."""
+        self.backend.close()
+
+    def __enter__(self) -> OutboxClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class AsyncOutboxClient:
+    """Async client for the Outbox mail queue service (HTTP mode only).
+
+    Usage:
+        async with AsyncOutboxClient(
+            server_url="https://outbox.example.com", api_key="ob_..."
+        ) as client:
+            results = await asyncio.gather(*(client.get_status(u) for u in uuids))
+    """
+
+    def __init__(
+        self, server_url: str, api_key: str, legacy: bool = False, http2: bool = False
+    ) -> None:
+        from outbox.client.backends.async_http import AsyncHttpBackend
+
+        self.backend = AsyncHttpBackend(server_url, api_key, legacy=legacy, http2=http2)
+        self.mode = "http"
+
+    async def submit_message(self, message: Message) -> MessageResult:
+        """Submit a message to the queue."""
+        return await self.backend.submit_message(message)
+
+    async def submit_messages(self, messages: Sequence[Message]) -> list[MessageResult]:
+        """Submit several messages to the queue in one batch."""
+        return await self.backend.submit_messages(messages)
+
+    async def get_status(self, uuid: str) -> MessageResult | None:
+        """Get the status of a message by UUID."""
+        return await self.backend.get_status(uuid)
+
+    async def list_messages(
+        self,
+        status: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list[MessageResult]:
+        """List messages with optional filtering."""
+        return await self.backend.list_messages(status=status, limit=limit, offset=offset)
+
+    async def retry_message(self, uuid: str) -> MessageResult | None:
+        """Retry a failed/dead message."""
+        return await self.backend.retry_message(uuid)
+
+    async def cancel_message(self, uuid: str) -> MessageResult | None:
+        """Cancel a queued message."""
+        return await self.backend.cancel_message(uuid)
+
+    async def aclose(self) -> None:
+        """Release the backend's connections."""
+        await self.backend.aclose()
+
+    async def __aenter__(self) -> AsyncOutboxClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
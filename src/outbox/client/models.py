@@ -13,14 +13,14 @@ class MessageStatus(StrEnum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class Attachment:
     filename: str
     content_type: str
     data: bytes
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     from_address: str
     to: list[str]
@@ -34,7 +34,7 @@ class Message:
     attachments: list[Attachment] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageResult:
     uuid: str
     status: str
@@ -5,8 +5,11 @@ description, and whether it contains a secret.  The registry is the single
 source of truth for what settings exist.
 """
 
+import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from enum import Enum
+from pathlib import Path
 
 
 class ConfigType(Enum):
@@ -29,7 +32,7 @@ class ConfigEntry:
 # Registry -- every known setting
 # ---------------------------------------------------------------------------
 
-REGISTRY: list[ConfigEntry] = [
+REGISTRY: tuple[ConfigEntry, ...] = (
     # -- server --
     ConfigEntry("server.host", ConfigType.STRING, "0.0.0.0", "Bind address for production server"),
     ConfigEntry("server.port", ConfigType.INT, 5200, "Port for production server"),
@@ -53,6 +56,9 @@ REGISTRY: list[ConfigEntry] = [
     ),
     ConfigEntry("queue.retry_max_seconds", ConfigType.INT, 3600, "Maximum retry delay in seconds"),
     ConfigEntry("queue.batch_size", ConfigType.INT, 10, "Messages to process per batch"),
+    ConfigEntry(
+        "queue.smtp_concurrency", ConfigType.INT, 4, "SMTP connections used to send a batch"
+    ),
     # -- retention --
     ConfigEntry("retention.days", ConfigType.INT, 30, "Days to keep sent/dead messages"),
     # -- blobs --
@@ -71,15 +77,21 @@ REGISTRY: list[ConfigEntry] = [
     ConfigEntry(
         "proxy.x_forwarded_prefix", ConfigType.INT, 0, "Trust X-Forwarded-Prefix (hop count)"
     ),
-]
+)
 
-# Fast lookup by key
-_REGISTRY_MAP: dict[str, ConfigEntry] = {e.key: e for e in REGISTRY}
+# Lookup by key; use this rather than scanning REGISTRY
+REGISTRY_BY_KEY: dict[str, ConfigEntry] = {e.key: e for e in REGISTRY}
+
+# Entries grouped by key prefix ("server", "mail", ...), in registry order
+REGISTRY_BY_GROUP: dict[str, list[ConfigEntry]] = {}
+for _entry in REGISTRY:
+    REGISTRY_BY_GROUP.setdefault(_entry.key.split(".", 1)[0], []).append(_entry)
+del _entry
 
 
 def resolve_entry(key: str) -> ConfigEntry | None:
     """Look up a registry entry by key."""
-    return _REGISTRY_MAP.get(key)
+    return REGISTRY_BY_KEY.get(key)
 
 
 # ---------------------------------------------------------------------------
@@ -87,30 +99,44 @@ def resolve_entry(key: str) -> ConfigEntry | None:
 # ---------------------------------------------------------------------------
 
 
+_TRUE_STRINGS = frozenset(("true", "1", "yes", "on"))
+
+
+def _parse_bool(raw: str) -> bool:
+    return raw.lower() in _TRUE_STRINGS
+
+
+def _parse_list(raw: str) -> list[str]:
+    return [s.strip() for s in raw.split(",") if s.strip()]
+
+
+def _serialize_list(value: str | int | bool | list[str]) -> str:
+    return ", ".join(value) if isinstance(value, list) else str(value)
+
+
+_PARSE_DISPATCH: dict[ConfigType, Callable[[str], str | int | bool | list[str]]] = {
+    ConfigType.STRING: str,
+    ConfigType.INT: int,
+    ConfigType.BOOL: _parse_bool,
+    ConfigType.STRING_LIST: _parse_list,
+}
+
+_SERIALIZE_DISPATCH: dict[ConfigType, Callable[[str | int | bool | list[str]], str]] = {
+    ConfigType.STRING: str,
+    ConfigType.INT: str,
+    ConfigType.BOOL: lambda value: "true" if value else "false",
+    ConfigType.STRING_LIST: _serialize_list,
+}
+
+
 def parse_value(entry: ConfigEntry, raw: str) -> str | int | bool | list[str]:
     """Parse a raw string value according to the entry's type."""
-    match entry.type:
-        case ConfigType.STRING:
-            return raw
-        case ConfigType.INT:
-            return int(raw)
-        case ConfigType.BOOL:
-            return raw.lower() in ("true", "1", "yes", "on")
-        case ConfigType.STRING_LIST:
-            return [s.strip() for s in raw.split(",") if s.strip()]
+    return _PARSE_DISPATCH[entry.type](raw)
 
 
 def serialize_value(entry: ConfigEntry, value: str | int | bool | list[str]) -> str:
     """Serialize a typed value to a string for storage."""
-    match entry.type:
-        case ConfigType.BOOL:
-            return "true" if value else "false"
-        case ConfigType.STRING_LIST:
-            if isinstance(value, list):
-                return ", ".join(value)
-            return str(value)
-        case _:
-            return str(value)
+    return _SERIALIZE_DISPATCH[entry.type](value)
 
 
 # ---------------------------------------------------------------------------
@@ -134,6 +160,7 @@ KEY_MAP: dict[str, str] = {
     "queue.retry_base_seconds": "QUEUE_RETRY_BASE_SECONDS",
     "queue.retry_max_seconds": "QUEUE_RETRY_MAX_SECONDS",
     "queue.batch_size": "QUEUE_BATCH_SIZE",
+    "queue.smtp_concurrency": "QUEUE_SMTP_CONCURRENCY",
     "retention.days": "RETENTION_DAYS",
     "blobs.directory": "BLOB_DIRECTORY",
     "blobs.max_size_mb": "BLOB_MAX_SIZE_MB",
@@ -146,6 +173,11 @@ KEY_MAP: dict[str, str] = {
     "proxy.x_forwarded_prefix": "PROXY_X_FORWARDED_PREFIX",
 }
 
+# (registry entry, Flask key) pairs for every setting that is loaded into app.config
+CONFIG_BINDINGS: tuple[tuple[ConfigEntry, str], ...] = tuple(
+    (entry, KEY_MAP[entry.key]) for entry in REGISTRY if entry.key in KEY_MAP
+)
+
 
 # ---------------------------------------------------------------------------
 # INI section/key -> registry key mapping (for config import)
@@ -169,6 +201,7 @@ INI_MAP: dict[tuple[str, str], str | None] = {
     ("queue", "RETRY_BASE_SECONDS"): "queue.retry_base_seconds",
     ("queue", "RETRY_MAX_SECONDS"): "queue.retry_max_seconds",
     ("queue", "BATCH_SIZE"): "queue.batch_size",
+    ("queue", "SMTP_CONCURRENCY"): "queue.smtp_concurrency",
     ("retention", "DAYS"): "retention.days",
     ("blobs", "DIRECTORY"): "blobs.directory",
     ("blobs", "MAX_SIZE_MB"): "blobs.max_size_mb",
@@ -180,3 +213,48 @@ INI_MAP: dict[tuple[str, str], str | None] = {
     ("proxy", "X_FORWARDED_HOST"): "proxy.x_forwarded_host",
     ("proxy", "X_FORWARDED_PREFIX"): "proxy.x_forwarded_prefix",
 }
+
+
+# ---------------------------------------------------------------------------
+# INI file parsing (for config import)
+# ---------------------------------------------------------------------------
+
+_SECTION_RE = re.compile(r"^\[([^\]]+)\]\s*$")
+_KV_RE = re.compile(r"^([^=:\s][^=:]*?)\s*[:=]\s*(.*)$")
+
+
+def parse_ini(path: str | Path) -> dict[str, dict[str, str]]:
+    """Parse an INI file into {section: {key: value}}.
+
+    A small subset of configparser: keys are lower-cased, ``#``/``;`` lines are
+    comments, indented lines continue the previous value, and [DEFAULT] entries
+    apply to every section. No interpolation is performed. Raises ValueError
+    naming the line for a key outside any section or a line that is neither a
+    section header nor a key/value pair.
+    """
+    sections: dict[str, dict[str, str]] = {}
+    current: dict[str, str] | None = None
+    last_key: str | None = None
+
+    for lineno, line in enumerate(Path(path).read_text(encoding="utf-8-sig").splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+        if line[0].isspace() and current is not None and last_key is not None:
+            current[last_key] = f"{current[last_key]}\n{stripped}"
+            continue
+        if m := _SECTION_RE.match(stripped):
+            current = sections.setdefault(m.group(1).strip(), {})
+            last_key = None
+        elif m := _KV_RE.match(stripped):
+            if current is None:
+                raise ValueError(f"{path}, line {lineno}: key before any [section]: {line!r}")
+            last_key = m.group(1).strip().lower()
+            current[last_key] = m.group(2).strip()
+        else:
+            raise ValueError(f"{path}, line {lineno}: cannot parse {line!r}")
+
+    defaults = sections.pop("DEFAULT", {})
+    if defaults:
+        return {name: defaults | values for name, values in sections.items()}
+    return sections
@@ -1,99 +1,151 @@
 """API key model."""
 
+import atexit
 import secrets
+import threading
+from collections.abc import Iterator
 from dataclasses import dataclass
-from datetime import UTC, datetime
 
-from outbox.db import get_db, transaction
+from outbox.db import get_db, get_db_path, transaction, transaction_at
+from outbox.timeutil import utc_now_iso
 
 _API_KEY_COLUMNS = "id, key, description, enabled, created_at, last_used_at"
 
-
-@dataclass
+_INSERT_API_KEY_SQL = (
+    "INSERT INTO api_key (key, description, enabled, created_at) VALUES (?, ?, 1, ?)"
+)
+_VERIFY_API_KEY_SQL = f"SELECT {_API_KEY_COLUMNS} FROM api_key WHERE key = ? AND enabled = 1"
+_SELECT_API_KEY_SQL = f"SELECT {_API_KEY_COLUMNS} FROM api_key WHERE id = ?"
+_LIST_API_KEYS_SQL = f"SELECT {_API_KEY_COLUMNS} FROM api_key ORDER BY created_at DESC"
+_EXPORT_API_KEYS_SQL = (
+    "SELECT key, description, CASE WHEN enabled THEN 'Yes' ELSE 'No' END, created_at, "
+    "COALESCE(last_used_at, '') FROM api_key ORDER BY created_at DESC"
+)
+_UPDATE_LAST_USED_SQL = "UPDATE api_key SET last_used_at = ? WHERE id = ?"
+
+# last_used_at stamps are buffered per process and written by a timer this long
+# after the first unwritten stamp, so authenticating a request does not need a
+# write transaction. Whatever is still buffered is written at exit.
+_LAST_USED_FLUSH_SECONDS = 5.0
+_pending_last_used: dict[int, str] = {}
+_pending_lock = threading.Lock()
+_pending_db_path: str | None = None
+_flush_timer: threading.Timer | None = None
+
+
+def _record_last_used(key_id: int, now: str) -> None:
+    """Buffer a last_used_at stamp and make sure a flush is scheduled."""
+    global _pending_db_path
+    db_path = get_db_path()
+    with _pending_lock:
+        _pending_last_used[key_id] = now
+        _pending_db_path = db_path
+        _schedule_flush()
+
+
+def _schedule_flush() -> None:
+    """Start the flush timer unless one is already pending (call with the lock held)."""
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(_LAST_USED_FLUSH_SECONDS, flush_last_used)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+@atexit.register
+def flush_last_used() -> None:
+    """Write the buffered last_used_at stamps.
+
+    Works without a Flask context. If the write fails, the stamps go back into
+    the buffer (newer ones win) and another flush is scheduled.
+    """
+    global _flush_timer
+    with _pending_lock:
+        _flush_timer = None
+        if not _pending_last_used or _pending_db_path is None:
+            return
+        pending = dict(_pending_last_used)
+        db_path = _pending_db_path
+        _pending_last_used.clear()
+
+    try:
+        with transaction_at(db_path) as cursor:
+            cursor.executemany(_UPDATE_LAST_USED_SQL, [(ts, kid) for kid, ts in pending.items()])
+    except Exception:
+        with _pending_lock:
+            for kid, ts in pending.items():
+                _pending_last_used.setdefault(kid, ts)
+            _schedule_flush()
+        raise
+
+
+@dataclass(slots=True)
 class ApiKey:
     id: int
     key: str
     description: str
-    enabled: bool
+    enabled: int  # SQLite 0/1; only ever tested for truthiness
     created_at: str
     last_used_at: str | None
 
     @staticmethod
     def _from_row(row: tuple) -> ApiKey:
-        return ApiKey(
-            id=row[0],
-            key=row[1],
-            description=row[2],
-            enabled=bool(row[3]),
-            created_at=row[4],
-            last_used_at=row[5],
-        )
+        return ApiKey(*row)
 
     @staticmethod
     def generate(description: str = "") -> ApiKey:
         """Generate a new API key."""
         raw_key = "ob_" + secrets.token_urlsafe(32)
-        now = datetime.now(UTC).isoformat()
+        now = utc_now_iso()
 
         with transaction() as cursor:
-            cursor.execute(
-                "INSERT INTO api_key (key, description, enabled, created_at) VALUES (?, ?, 1, ?)",
-                (raw_key, description, now),
-            )
-            row = cursor.execute("SELECT last_insert_rowid()").fetchone()
-            key_id = int(row[0]) if row else 0
+            cursor.execute(_INSERT_API_KEY_SQL, (raw_key, description, now))
+            key_id = cursor.connection.last_insert_rowid()
 
         return ApiKey(
             id=key_id,
             key=raw_key,
             description=description,
-            enabled=True,
+            enabled=1,
             created_at=now,
             last_used_at=None,
         )
 
     @staticmethod
     def verify(raw_key: str) -> ApiKey | None:
-        """Verify an API key and return the ApiKey if valid and enabled."""
+        """Verify an API key and return the ApiKey if valid and enabled.
+
+        The last_used_at update is buffered and written in batches.
+        """
         db = get_db()
-        row = db.execute(
-            f"SELECT {_API_KEY_COLUMNS} FROM api_key WHERE key = ? AND enabled = 1",
-            (raw_key,),
-        ).fetchone()
+        row = db.execute(_VERIFY_API_KEY_SQL, (raw_key,)).fetchone()
 
         if row is None:
             return None
 
         api_key = ApiKey._from_row(row)
-        now = datetime.now(UTC).isoformat()
-        with transaction() as cursor:
-            cursor.execute(
-                "UPDATE api_key SET last_used_at = ? WHERE id = ?",
-                (now, api_key.id),
-            )
-        api_key.last_used_at = now
+        api_key.last_used_at = utc_now_iso()
+        _record_last_used(api_key.id, api_key.last_used_at)
         return api_key
 
     @staticmethod
     def get(key_id: int) -> ApiKey | None:
         """Get an API key by ID."""
         db = get_db()
-        row = db.execute(
-            f"SELECT {_API_KEY_COLUMNS} FROM api_key WHERE id = ?", (key_id,)
-        ).fetchone()
+        row = db.execute(_SELECT_API_KEY_SQL, (key_id,)).fetchone()
         return ApiKey._from_row(row) if row else None
 
     def disable(self) -> None:
         """Disable this API key."""
         with transaction() as cursor:
             cursor.execute("UPDATE api_key SET enabled = 0 WHERE id = ?", (self.id,))
-        self.enabled = False
+        self.enabled = 0
 
     def enable(self) -> None:
         """Enable this API key."""
         with transaction() as cursor:
             cursor.execute("UPDATE api_key SET enabled = 1 WHERE id = ?", (self.id,))
-        self.enabled = True
+        self.enabled = 1
 
     def delete(self) -> None:
         """Delete this API key."""
@@ -104,7 +156,11 @@ class ApiKey:
     def get_all() -> list[ApiKey]:
         """Get all API keys."""
         db = get_db()
-        rows = db.execute(
-            f"SELECT {_API_KEY_COLUMNS} FROM api_key ORDER BY created_at DESC"
-        ).fetchall()
-        return [ApiKey._from_row(row) for row in rows]
+        rows = db.execute(_LIST_API_KEYS_SQL)
+        return list(map(ApiKey._from_row, rows))
+
+    @staticmethod
+    def iter_export_rows() -> Iterator[tuple[str, str, str, str, str]]:
+        """Yield (key, description, enabled, created, last used) rows straight from the cursor."""
+        db = get_db()
+        yield from db.execute(_EXPORT_API_KEYS_SQL)
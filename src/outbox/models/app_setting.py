@@ -1,39 +1,70 @@
 """App settings model (key-value store)."""
 
+import threading
+import time
+
 from outbox.db import get_db, transaction
 
+_SELECT_SETTING_SQL = "SELECT value FROM app_setting WHERE key = ?"
+_UPSERT_SETTING_SQL = (
+    "INSERT INTO app_setting (key, value, description) VALUES (?, ?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, description = excluded.description"
+)
+_UPSERT_SETTING_VALUE_SQL = (
+    "INSERT INTO app_setting (key, value, description) VALUES (?, ?, '') "
+    "ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+)
+_LIST_SETTINGS_SQL = "SELECT key, value, description FROM app_setting ORDER BY key"
+
+# Values read through AppSetting.get, kept per process for a short time;
+# set() writes through. Writes made by other processes (the CLI, other
+# gunicorn workers) show up once the entry expires.
+_CACHE_TTL_SECONDS = 30.0
+# Read on every call: every process must agree on the signing key at once
+_UNCACHED_KEYS = frozenset({"secret_key"})
+# key -> (value, time.monotonic() deadline)
+_cache: dict[str, tuple[str | None, float]] = {}
+_cache_lock = threading.Lock()
+
 
 class AppSetting:
     @staticmethod
     def get(key: str) -> str | None:
         """Get a setting value by key."""
+        entry = _cache.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
         db = get_db()
-        row = db.execute("SELECT value FROM app_setting WHERE key = ?", (key,)).fetchone()
-        return row[0] if row else None
+        row = db.execute(_SELECT_SETTING_SQL, (key,)).fetchone()
+        value = row[0] if row else None
+        if key not in _UNCACHED_KEYS:
+            with _cache_lock:
+                _cache[key] = (value, time.monotonic() + _CACHE_TTL_SECONDS)
+        return value
 
     @staticmethod
     def set(key: str, value: str, description: str | None = None) -> None:
         """Set a setting value, creating or updating as needed."""
         with transaction() as cursor:
             if description is not None:
-                cursor.execute(
-                    "INSERT INTO app_setting (key, value, description) VALUES (?, ?, ?) "
-                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
-                    "description = excluded.description",
-                    (key, value, description),
-                )
+                cursor.execute(_UPSERT_SETTING_SQL, (key, value, description))
             else:
-                cursor.execute(
-                    "INSERT INTO app_setting (key, value, description) VALUES (?, ?, '') "
-                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
-                    (key, value),
-                )
+                cursor.execute(_UPSERT_SETTING_VALUE_SQL, (key, value))
+        if key not in _UNCACHED_KEYS:
+            with _cache_lock:
+                _cache[key] = (value, time.monotonic() + _CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop cached values so the next get() reads from the database."""
+        with _cache_lock:
+            _cache.clear()
 
     @staticmethod
     def get_all() -> list[tuple[str, str, str | None]]:
         """Get all settings as (key, value, description) tuples."""
         db = get_db()
-        rows = db.execute("SELECT key, value, description FROM app_setting ORDER BY key").fetchall()
+        rows = db.execute(_LIST_SETTINGS_SQL).fetchall()
         return [
             (str(row[0]), str(row[1]), str(row[2]) if row[2] is not None else None) for row in rows
         ]
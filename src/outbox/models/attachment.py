@@ -1,16 +1,28 @@
 """Attachment metadata model."""
 
+from collections.abc import Sequence
 from dataclasses import dataclass
-from datetime import UTC, datetime
+
+import apsw
 
 from outbox.db import get_db, transaction
+from outbox.timeutil import utc_now_iso
 
 _ATTACHMENT_COLUMNS = (
     "id, message_id, filename, content_type, size_bytes, sha256, disk_path, created_at"
 )
 
+_INSERT_ATTACHMENT_SQL = (
+    "INSERT INTO attachment "
+    "(message_id, filename, content_type, size_bytes, sha256, disk_path, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_SELECT_FOR_MESSAGE_SQL = (
+    f"SELECT {_ATTACHMENT_COLUMNS} FROM attachment WHERE message_id = ? ORDER BY id"
+)
+
 
-@dataclass
+@dataclass(slots=True)
 class Attachment:
     id: int
     message_id: int
@@ -23,16 +35,7 @@ class Attachment:
 
     @staticmethod
     def _from_row(row: tuple) -> Attachment:
-        return Attachment(
-            id=row[0],
-            message_id=row[1],
-            filename=row[2],
-            content_type=row[3],
-            size_bytes=row[4],
-            sha256=row[5],
-            disk_path=row[6],
-            created_at=row[7],
-        )
+        return Attachment(*row)
 
     @staticmethod
     def create(
@@ -44,45 +47,53 @@ class Attachment:
         disk_path: str,
     ) -> Attachment:
         """Create a new attachment record."""
-        now = datetime.now(UTC).isoformat()
+        return Attachment.create_many(
+            message_id, [(filename, content_type, size_bytes, sha256, disk_path)]
+        )[0]
 
-        with transaction() as cursor:
-            cursor.execute(
-                "INSERT INTO attachment "
-                "(message_id, filename, content_type, size_bytes, sha256, disk_path, created_at) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (message_id, filename, content_type, size_bytes, sha256, disk_path, now),
-            )
-            row = cursor.execute("SELECT last_insert_rowid()").fetchone()
-            att_id = int(row[0]) if row else 0
+    @staticmethod
+    def create_many(
+        message_id: int,
+        items: Sequence[tuple[str, str, int, str, str]],
+        cursor: apsw.Cursor | None = None,
+    ) -> list[Attachment]:
+        """Create attachment records for several items in one transaction.
 
-        return Attachment(
-            id=att_id,
-            message_id=message_id,
-            filename=filename,
-            content_type=content_type,
-            size_bytes=size_bytes,
-            sha256=sha256,
-            disk_path=disk_path,
-            created_at=now,
-        )
+        Items are (filename, content_type, size_bytes, sha256, disk_path) tuples.
+        Pass the cursor of an open transaction() to insert as part of it.
+        """
+        if not items:
+            return []
+        now = utc_now_iso()
+        rows = [(message_id, *item, now) for item in items]
+
+        if cursor is None:
+            with transaction() as cursor:
+                cursor.executemany(_INSERT_ATTACHMENT_SQL, rows)
+                last_id = cursor.connection.last_insert_rowid()
+        else:
+            cursor.executemany(_INSERT_ATTACHMENT_SQL, rows)
+            last_id = cursor.connection.last_insert_rowid()
+
+        # The write lock is held for the whole transaction, so the ids are contiguous
+        first_id = last_id - len(items) + 1
+        return [
+            Attachment(
+                id=first_id + i,
+                message_id=message_id,
+                filename=filename,
+                content_type=content_type,
+                size_bytes=size_bytes,
+                sha256=sha256,
+                disk_path=disk_path,
+                created_at=now,
+            )
+            for i, (filename, content_type, size_bytes, sha256, disk_path) in enumerate(items)
+        ]
 
     @staticmethod
     def get_for_message(message_id: int) -> list[Attachment]:
         """Get all attachments for a message."""
         db = get_db()
-        rows = db.execute(
-            f"SELECT {_ATTACHMENT_COLUMNS} FROM attachment WHERE message_id = ? ORDER BY id",
-            (message_id,),
-        ).fetchall()
-        return [Attachment._from_row(row) for row in rows]
-
-    @staticmethod
-    def find_by_sha256(sha256: str) -> Attachment | None:
-        """Find an existing attachment by SHA256 hash (for dedup)."""
-        db = get_db()
-        row = db.execute(
-            f"SELECT {_ATTACHMENT_COLUMNS} FROM attachment WHERE sha256 = ? LIMIT 1",
-            (sha256,),
-        ).fetchone()
-        return Attachment._from_row(row) if row else None
+        rows = db.execute(_SELECT_FOR_MESSAGE_SQL, (message_id,))
+        return list(map(Attachment._from_row, rows))
@@ -2,20 +2,154 @@
 
 import json
 import uuid as uuid_mod
-from dataclasses import dataclass
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from typing import Any
+
+import apsw
+import orjson
 
 from outbox.db import get_db, transaction
+from outbox.timeutil import utc_now_iso
 
 _MESSAGE_COLUMNS = (
     "id, uuid, status, delivery_type, from_address, to_recipients, cc_recipients, "
     "bcc_recipients, subject, body, body_type, retries_remaining, next_retry_at, "
     "last_error, source_app, source_api_key_id, created_at, updated_at, sent_at"
 )
+_INSERT_MESSAGE_SQL = (
+    "INSERT INTO message "
+    "(uuid, status, delivery_type, from_address, to_recipients, cc_recipients, "
+    "bcc_recipients, subject, body, body_type, retries_remaining, "
+    "source_app, source_api_key_id, created_at, updated_at) "
+    "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Field order of MessageSummary
+_SUMMARY_COLUMNS = (
+    "id, uuid, status, delivery_type, from_address, to_recipients, cc_recipients, "
+    "bcc_recipients, subject, body_type, retries_remaining, last_error, source_app, "
+    "created_at, updated_at, sent_at"
+)
+_SELECT_BY_UUID_SQL = f"SELECT {_MESSAGE_COLUMNS} FROM message WHERE uuid = ?"
+_SELECT_BY_ID_SQL = f"SELECT {_MESSAGE_COLUMNS} FROM message WHERE id = ?"
+# The status list must match idx_message_purge's WHERE clause for the partial index to apply
+_PURGE_CHUNK_SQL = (
+    "DELETE FROM message WHERE id IN ("
+    "SELECT id FROM message WHERE status IN ('sent', 'dead', 'cancelled') "
+    "AND updated_at < ? LIMIT ?)"
+)
+_PURGE_CHUNK_SIZE = 1000
+# message_stats is maintained by triggers on message (see schema.sql)
+_STATS_SQL = "SELECT status, count FROM message_stats WHERE count > 0"
+_COUNT_STATUS_SQL = "SELECT count FROM message_stats WHERE status = ?"
+_COUNT_ALL_SQL = "SELECT SUM(count) FROM message_stats"
+# Same timestamp form as _PENDING_BATCH_SQL; ?2 is an SQLite time modifier
+_RECLAIM_STALE_SQL = (
+    "UPDATE message SET status = 'queued', updated_at = ?1 WHERE status = 'sending' "
+    "AND updated_at < strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now', ?2)"
+)
+# Each branch is an index range scan over a partial index (idx_message_queued,
+# idx_message_retry); only the merged 2 * limit rows are sorted. "now" is built
+# in SQLite in the same ISO form the timestamps are stored in.
+_PENDING_BATCH_SQL = (
+    f"SELECT * FROM (SELECT {_MESSAGE_COLUMNS} FROM message "
+    "WHERE status = 'queued' ORDER BY created_at LIMIT ?1) "
+    f"UNION ALL SELECT * FROM (SELECT {_MESSAGE_COLUMNS} FROM message "
+    "WHERE status = 'failed' "
+    "AND next_retry_at <= strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') "
+    "ORDER BY created_at LIMIT ?1) "
+    "ORDER BY created_at LIMIT ?1"
+)
+
+
+def _filter_clause(status: str | None, search: str | None) -> tuple[str, list[str | int]]:
+    """Build the WHERE clause and parameters for the status/search filters."""
+    conditions = []
+    params: list[str | int] = []
+
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    if search:
+        conditions.append(
+            "(subject LIKE ? OR to_recipients LIKE ? OR from_address LIKE ? OR uuid LIKE ?)"
+        )
+        term = f"%{search}%"
+        params.extend([term, term, term, term])
+
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+def _parse_recipients(raw: str | None) -> list[str]:
+    """Parse a JSON recipient list; a value that is not JSON is a single address."""
+    if not raw:
+        return []
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return [raw]
+
 
+class _RecipientLists:
+    """Cached to/cc/bcc parsing shared by Message and MessageSummary."""
+
+    __slots__ = ()
+
+    to_recipients: str
+    cc_recipients: str | None
+    bcc_recipients: str | None
+    _to: list[str] | None
+    _cc: list[str] | None
+    _bcc: list[str] | None
+
+    def to_list(self) -> list[str]:
+        """Parse to_recipients JSON into a list (parsed once per instance)."""
+        if self._to is None:
+            self._to = _parse_recipients(self.to_recipients)
+        return self._to
+
+    def cc_list(self) -> list[str]:
+        """Parse cc_recipients JSON into a list (parsed once per instance)."""
+        if self._cc is None:
+            self._cc = _parse_recipients(self.cc_recipients)
+        return self._cc
+
+    def bcc_list(self) -> list[str]:
+        """Parse bcc_recipients JSON into a list (parsed once per instance)."""
+        if self._bcc is None:
+            self._bcc = _parse_recipients(self.bcc_recipients)
+        return self._bcc
+
+
+@dataclass(slots=True)
+class MessageSummary(_RecipientLists):
+    """The columns a message list needs; the body is never loaded."""
 
-@dataclass
-class Message:
+    id: int
+    uuid: str
+    status: str
+    delivery_type: str
+    from_address: str
+    to_recipients: str
+    cc_recipients: str | None
+    bcc_recipients: str | None
+    subject: str
+    body_type: str
+    retries_remaining: int
+    last_error: str | None
+    source_app: str | None
+    created_at: str
+    updated_at: str
+    sent_at: str | None
+    _to: list[str] | None = field(default=None, init=False, repr=False, compare=False)
+    _cc: list[str] | None = field(default=None, init=False, repr=False, compare=False)
+    _bcc: list[str] | None = field(default=None, init=False, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class Message(_RecipientLists):
     id: int
     uuid: str
     status: str
@@ -35,55 +169,15 @@ class Message:
     created_at: str
     updated_at: str
     sent_at: str | None
+    # Parsed recipient lists, filled in on first use
+    _to: list[str] | None = field(default=None, init=False, repr=False, compare=False)
+    _cc: list[str] | None = field(default=None, init=False, repr=False, compare=False)
+    _bcc: list[str] | None = field(default=None, init=False, repr=False, compare=False)
 
     @staticmethod
     def _from_row(row: tuple) -> Message:
-        return Message(
-            id=row[0],
-            uuid=row[1],
-            status=row[2],
-            delivery_type=row[3],
-            from_address=row[4],
-            to_recipients=row[5],
-            cc_recipients=row[6],
-            bcc_recipients=row[7],
-            subject=row[8],
-            body=row[9],
-            body_type=row[10],
-            retries_remaining=row[11],
-            next_retry_at=row[12],
-            last_error=row[13],
-            source_app=row[14],
-            source_api_key_id=row[15],
-            created_at=row[16],
-            updated_at=row[17],
-            sent_at=row[18],
-        )
-
-    def to_list(self) -> list[str]:
-        """Parse to_recipients JSON into a list."""
-        try:
-            return json.loads(self.to_recipients)
-        except json.JSONDecodeError, TypeError:
-            return [self.to_recipients] if self.to_recipients else []
-
-    def cc_list(self) -> list[str]:
-        """Parse cc_recipients JSON into a list."""
-        if not self.cc_recipients:
-            return []
-        try:
-            return json.loads(self.cc_recipients)
-        except json.JSONDecodeError, TypeError:
-            return [self.cc_recipients]
-
-    def bcc_list(self) -> list[str]:
-        """Parse bcc_recipients JSON into a list."""
-        if not self.bcc_recipients:
-            return []
-        try:
-            return json.loads(self.bcc_recipients)
-        except json.JSONDecodeError, TypeError:
-            return [self.bcc_recipients]
+        # Field order matches _MESSAGE_COLUMNS
+        return Message(*row)
 
     @staticmethod
     def create(
@@ -100,87 +194,174 @@ class Message:
         max_retries: int = 5,
     ) -> Message:
         """Create a new message in the queue."""
-        msg_uuid = str(uuid_mod.uuid4())
-        now = datetime.now(UTC).isoformat()
-        to_json = json.dumps(to_recipients)
-        cc_json = json.dumps(cc_recipients) if cc_recipients else None
-        bcc_json = json.dumps(bcc_recipients) if bcc_recipients else None
+        return Message.create_many(
+            [
+                {
+                    "from_address": from_address,
+                    "to_recipients": to_recipients,
+                    "subject": subject,
+                    "body": body,
+                    "body_type": body_type,
+                    "delivery_type": delivery_type,
+                    "cc_recipients": cc_recipients,
+                    "bcc_recipients": bcc_recipients,
+                    "source_app": source_app,
+                    "source_api_key_id": source_api_key_id,
+                    "max_retries": max_retries,
+                }
+            ]
+        )[0]
 
-        with transaction() as cursor:
-            cursor.execute(
-                "INSERT INTO message "
-                "(uuid, status, delivery_type, from_address, to_recipients, cc_recipients, "
-                "bcc_recipients, subject, body, body_type, retries_remaining, "
-                "source_app, source_api_key_id, created_at, updated_at) "
-                "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    msg_uuid,
-                    delivery_type,
-                    from_address,
-                    to_json,
-                    cc_json,
-                    bcc_json,
-                    subject,
-                    body,
-                    body_type,
-                    max_retries,
-                    source_app,
-                    source_api_key_id,
-                    now,
-                    now,
-                ),
+    @staticmethod
+    def create_many(
+        items: Sequence[dict[str, Any]], cursor: apsw.Cursor | None = None
+    ) -> list[Message]:
+        """Create several messages in the queue in one transaction.
+
+        Each item holds the keyword arguments of create(); omitted optional
+        fields take the same defaults. Pass the cursor of an open transaction()
+        to insert as part of it instead of in a transaction of their own.
+        """
+        if not items:
+            return []
+        now = utc_now_iso()
+        messages = []
+        for item in items:
+            cc = item.get("cc_recipients")
+            bcc = item.get("bcc_recipients")
+            messages.append(
+                Message(
+                    id=0,
+                    uuid=str(uuid_mod.uuid4()),
+                    status="queued",
+                    delivery_type=item.get("delivery_type", "email"),
+                    from_address=item["from_address"],
+                    to_recipients=json.dumps(item["to_recipients"]),
+                    cc_recipients=json.dumps(cc) if cc else None,
+                    bcc_recipients=json.dumps(bcc) if bcc else None,
+                    subject=item.get("subject", ""),
+                    body=item.get("body", ""),
+                    body_type=item.get("body_type", "plain"),
+                    retries_remaining=item.get("max_retries", 5),
+                    next_retry_at=None,
+                    last_error=None,
+                    source_app=item.get("source_app"),
+                    source_api_key_id=item.get("source_api_key_id"),
+                    created_at=now,
+                    updated_at=now,
+                    sent_at=None,
+                )
             )
-            row = cursor.execute("SELECT last_insert_rowid()").fetchone()
-            msg_id = int(row[0]) if row else 0
-
-        return Message(
-            id=msg_id,
-            uuid=msg_uuid,
-            status="queued",
-            delivery_type=delivery_type,
-            from_address=from_address,
-            to_recipients=to_json,
-            cc_recipients=cc_json,
-            bcc_recipients=bcc_json,
-            subject=subject,
-            body=body,
-            body_type=body_type,
-            retries_remaining=max_retries,
-            next_retry_at=None,
-            last_error=None,
-            source_app=source_app,
-            source_api_key_id=source_api_key_id,
-            created_at=now,
-            updated_at=now,
-            sent_at=None,
+
+        if cursor is None:
+            with transaction() as cursor:
+                Message._insert_all(cursor, messages)
+        else:
+            Message._insert_all(cursor, messages)
+        return messages
+
+    @staticmethod
+    def _insert_all(cursor: apsw.Cursor, messages: list[Message]) -> None:
+        """Insert built messages with one executemany and fill in their ids."""
+        cursor.executemany(
+            _INSERT_MESSAGE_SQL,
+            [
+                (
+                    m.uuid,
+                    m.delivery_type,
+                    m.from_address,
+                    m.to_recipients,
+                    m.cc_recipients,
+                    m.bcc_recipients,
+                    m.subject,
+                    m.body,
+                    m.body_type,
+                    m.retries_remaining,
+                    m.source_app,
+                    m.source_api_key_id,
+                    m.created_at,
+                    m.updated_at,
+                )
+                for m in messages
+            ],
         )
+        last_id = cursor.connection.last_insert_rowid()
+
+        # The write lock is held for the whole transaction, so the ids are contiguous
+        first_id = last_id - len(messages) + 1
+        for i, message in enumerate(messages):
+            message.id = first_id + i
 
     @staticmethod
     def get_by_uuid(msg_uuid: str) -> Message | None:
         """Get a message by UUID."""
         db = get_db()
-        row = db.execute(
-            f"SELECT {_MESSAGE_COLUMNS} FROM message WHERE uuid = ?", (msg_uuid,)
-        ).fetchone()
+        row = db.execute(_SELECT_BY_UUID_SQL, (msg_uuid,)).fetchone()
         return Message._from_row(row) if row else None
 
     @staticmethod
     def get_by_id(msg_id: int) -> Message | None:
         """Get a message by ID."""
         db = get_db()
-        row = db.execute(
-            f"SELECT {_MESSAGE_COLUMNS} FROM message WHERE id = ?", (msg_id,)
-        ).fetchone()
+        row = db.execute(_SELECT_BY_ID_SQL, (msg_id,)).fetchone()
         return Message._from_row(row) if row else None
 
+    @staticmethod
+    def mark_sending(messages: Sequence[Message], now: str | None = None) -> None:
+        """Move a batch of messages to 'sending' with one UPDATE."""
+        if not messages:
+            return
+        now = now or utc_now_iso()
+        placeholders = ", ".join("?" * len(messages))
+        with transaction() as cursor:
+            cursor.execute(
+                f"UPDATE message SET status = 'sending', updated_at = ? WHERE id IN ({placeholders})",
+                (now, *(m.id for m in messages)),
+            )
+        for message in messages:
+            message.status = "sending"
+            message.updated_at = now
+
+    @staticmethod
+    def requeue_unsent(messages: Sequence[Message]) -> None:
+        """Put messages claimed by mark_sending but never attempted back to 'queued'."""
+        if not messages:
+            return
+        now = utc_now_iso()
+        placeholders = ", ".join("?" * len(messages))
+        with transaction() as cursor:
+            cursor.execute(
+                f"UPDATE message SET status = 'queued', updated_at = ? "
+                f"WHERE status = 'sending' AND id IN ({placeholders})",
+                (now, *(m.id for m in messages)),
+            )
+        for message in messages:
+            message.status = "queued"
+            message.updated_at = now
+
+    @staticmethod
+    def reclaim_stale_sending(max_age_seconds: int) -> int:
+        """Requeue messages left in 'sending' for longer than max_age_seconds.
+
+        Covers a worker that died mid-batch. Returns the number of messages requeued.
+        """
+        with transaction() as cursor:
+            cursor.execute(_RECLAIM_STALE_SQL, (utc_now_iso(), f"-{max_age_seconds} seconds"))
+            return cursor.connection.changes()
+
     def update_status(
         self,
         status: str,
         last_error: str | None = None,
         next_retry_at: str | None = None,
+        now: str | None = None,
     ) -> None:
-        """Update the message status."""
-        now = datetime.now(UTC).isoformat()
+        """Update the message status.
+
+        ``now`` lets a caller updating many messages stamp them all with one
+        timestamp instead of reading the clock per call.
+        """
+        now = now or utc_now_iso()
         sent_at = now if status == "sent" else self.sent_at
 
         with transaction() as cursor:
@@ -211,48 +392,78 @@ class Message:
         search: str | None = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> list[Message]:
-        """List messages with optional filters."""
+    ) -> list[MessageSummary]:
+        """List message summaries (no body) with optional filters."""
         db = get_db()
-        conditions = []
-        params: list[str | int] = []
+        where, params = _filter_clause(status, search)
+        params.extend([limit, offset])
 
-        if status:
-            conditions.append("status = ?")
-            params.append(status)
-        if search:
-            conditions.append(
-                "(subject LIKE ? OR to_recipients LIKE ? OR from_address LIKE ? OR uuid LIKE ?)"
-            )
-            term = f"%{search}%"
-            params.extend([term, term, term, term])
+        rows = db.execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM message{where} "
+            f"ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            tuple(params),
+        )
+        return [MessageSummary(*row) for row in rows]
 
-        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    @staticmethod
+    def list_messages_with_total(
+        status: str | None = None,
+        search: str | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> tuple[list[MessageSummary], int]:
+        """List one page of message summaries together with the total matching count."""
+        db = get_db()
+        where, params = _filter_clause(status, search)
+        filter_params = tuple(params)
         params.extend([limit, offset])
 
         rows = db.execute(
-            f"SELECT {_MESSAGE_COLUMNS} FROM message{where} "
+            f"SELECT {_SUMMARY_COLUMNS}, COUNT(*) OVER () FROM message{where} "
             f"ORDER BY created_at DESC LIMIT ? OFFSET ?",
             tuple(params),
         ).fetchall()
-        return [Message._from_row(row) for row in rows]
+        if rows:
+            return [MessageSummary(*row[:-1]) for row in rows], int(rows[0][-1])
+        if not offset:
+            return [], 0
+        # Past the last page: the window yields no rows, so count separately
+        row = db.execute(f"SELECT COUNT(*) FROM message{where}", filter_params).fetchone()
+        return [], int(row[0]) if row else 0
+
+    @staticmethod
+    def iter_export_rows(
+        status: str | None = None,
+        search: str | None = None,
+        limit: int = 10000,
+    ) -> Iterator[tuple[str, str, str, str, str, str]]:
+        """Yield (status, to, subject, source, created, sent) rows straight from the cursor."""
+        db = get_db()
+        where, params = _filter_clause(status, search)
+        params.append(limit)
+
+        yield from db.execute(
+            "SELECT status, to_recipients, subject, COALESCE(source_app, ''), created_at, "
+            f"COALESCE(sent_at, '') FROM message{where} ORDER BY created_at DESC LIMIT ?",
+            tuple(params),
+        )
 
     @staticmethod
     def count(status: str | None = None) -> int:
         """Count messages with optional status filter."""
         db = get_db()
         if status:
-            row = db.execute("SELECT COUNT(*) FROM message WHERE status = ?", (status,)).fetchone()
+            row = db.execute(_COUNT_STATUS_SQL, (status,)).fetchone()
         else:
-            row = db.execute("SELECT COUNT(*) FROM message").fetchone()
-        return int(row[0]) if row else 0
+            row = db.execute(_COUNT_ALL_SQL).fetchone()
+        return int(row[0]) if row and row[0] is not None else 0
 
     @staticmethod
     def stats() -> dict[str, int]:
-        """Get message count by status."""
+        """Get message count by status from the trigger-maintained rollup."""
         db = get_db()
-        rows = db.execute("SELECT status, COUNT(*) FROM message GROUP BY status").fetchall()
-        result: dict[str, int] = {str(row[0]): int(row[1] or 0) for row in rows}
+        rows = db.execute(_STATS_SQL).fetchall()
+        result: dict[str, int] = {str(row[0]): int(row[1]) for row in rows}
         result["total"] = sum(result.values())
         return result
 
@@ -260,28 +471,25 @@ class Message:
     def get_pending_batch(batch_size: int = 10) -> list[Message]:
         """Get a batch of messages ready for sending."""
         db = get_db()
-        now = datetime.now(UTC).isoformat()
-        rows = db.execute(
-            f"SELECT {_MESSAGE_COLUMNS} FROM message "
-            "WHERE status = 'queued' "
-            "OR (status = 'failed' AND next_retry_at IS NOT NULL AND next_retry_at <= ?) "
-            "ORDER BY created_at ASC LIMIT ?",
-            (now, batch_size),
-        ).fetchall()
-        return [Message._from_row(row) for row in rows]
+        rows = db.execute(_PENDING_BATCH_SQL, (batch_size,))
+        return list(map(Message._from_row, rows))
 
     @staticmethod
     def purge_old(retention_days: int) -> int:
-        """Delete old sent/dead messages beyond retention period."""
+        """Delete old sent/dead messages beyond retention period.
+
+        Deletes in chunks, each in its own short transaction, so a large purge
+        never holds the write lock long enough to stall the send path.
+        """
         from datetime import timedelta
 
         cutoff = (datetime.now(UTC) - timedelta(days=retention_days)).isoformat()
 
-        with transaction() as cursor:
-            cursor.execute(
-                "DELETE FROM message WHERE status IN ('sent', 'dead', 'cancelled') "
-                "AND updated_at < ?",
-                (cutoff,),
-            )
-            row = cursor.execute("SELECT changes()").fetchone()
-            return int(row[0]) if row else 0
+        purged = 0
+        while True:
+            with transaction() as cursor:
+                cursor.execute(_PURGE_CHUNK_SQL, (cutoff, _PURGE_CHUNK_SIZE))
+                deleted = cursor.connection.changes()
+            purged += deleted
+            if deleted < _PURGE_CHUNK_SIZE:
+                return purged
@@ -1,53 +1,126 @@
 """Attachment storage service with SHA256 deduplication."""
 
 import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO
 
 from flask import current_app
 
 from outbox.models.attachment import Attachment
 
+# Blob writes are I/O-bound, so a few threads overlap hashing and disk writes
+_MAX_WRITE_WORKERS = 4
+
+# Attachment content: in-memory bytes or a seekable binary stream
+Blob = bytes | BinaryIO
+
+
+def _blob_size(data: Blob) -> int:
+    """Return the byte length of a blob, leaving a stream rewound to the start."""
+    if isinstance(data, bytes):
+        return len(data)
+    size = data.seek(0, os.SEEK_END)
+    data.seek(0)
+    return size
 
-def save_attachment(
-    message_id: int,
-    filename: str,
-    content_type: str,
-    data: bytes,
-) -> Attachment:
-    """Save attachment data to disk and create a database record.
 
-    Uses SHA256 deduplication: if the same content already exists on disk,
-    reuses the existing file path.
+def _store_blob(blob_dir: Path, data: Blob) -> tuple[str, str]:
+    """Write data under its SHA256 hash unless it is already stored.
+
+    Streams are hashed in blocks with hashlib.file_digest. Content is written
+    and fsynced to a temp file in the blob's directory, then published with
+    os.link, so a blob path only ever holds complete content; a link that
+    finds the path taken is a dedup hit. Returns (sha256, disk_path).
+    """
+    if isinstance(data, bytes):
+        sha256 = hashlib.sha256(data).hexdigest()
+    else:
+        sha256 = hashlib.file_digest(data, "sha256").hexdigest()
+        data.seek(0)
+
+    # Store in subdirectory based on first 2 chars of hash
+    sub_dir = blob_dir / sha256[:2]
+    disk_path = sub_dir / sha256
+    if disk_path.exists():
+        # Published blobs are always complete, so no need to write it again
+        return sha256, str(disk_path)
+
+    sub_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=sub_dir, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(tmp_path, disk_path)
+        except FileExistsError:
+            # Another upload published the same content first
+            pass
+    finally:
+        os.unlink(tmp_path)
+
+    return sha256, str(disk_path)
+
+
+def store_blobs(items: Sequence[tuple[str, str, Blob]]) -> list[tuple[str, str, int, str, str]]:
+    """Size-check and write (filename, content_type, data) items to blob storage.
+
+    ``data`` is bytes or a seekable binary stream such as an uploaded file.
+    Blobs are content-addressed, so identical content is written once and
+    shared, and nothing touches the database: a caller can store blobs before
+    opening the transaction that records them. Returns Attachment.create_many
+    rows, (filename, content_type, size_bytes, sha256, disk_path).
     """
     blob_dir = Path(current_app.config["BLOB_DIRECTORY"])
     max_size = current_app.config["BLOB_MAX_SIZE_MB"] * 1024 * 1024
 
-    if len(data) > max_size:
-        raise ValueError(
-            f"Attachment too large: {len(data)} bytes "
-            f"(max {current_app.config['BLOB_MAX_SIZE_MB']} MB)"
+    sizes = [_blob_size(data) for _, _, data in items]
+    for size in sizes:
+        if size > max_size:
+            raise ValueError(
+                f"Attachment too large: {size} bytes "
+                f"(max {current_app.config['BLOB_MAX_SIZE_MB']} MB)"
+            )
+
+    if len(items) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(items), _MAX_WRITE_WORKERS)) as pool:
+            stored = list(pool.map(lambda item: _store_blob(blob_dir, item[2]), items))
+    else:
+        stored = [_store_blob(blob_dir, data) for _, _, data in items]
+
+    return [
+        (filename, content_type, size, sha256, disk_path)
+        for (filename, content_type, _), size, (sha256, disk_path) in zip(
+            items, sizes, stored, strict=True
         )
+    ]
 
-    sha256 = hashlib.sha256(data).hexdigest()
 
-    # Check for existing file with same hash
-    existing = Attachment.find_by_sha256(sha256)
-    if existing and Path(existing.disk_path).exists():
-        disk_path = existing.disk_path
-    else:
-        # Store in subdirectory based on first 2 chars of hash
-        sub_dir = blob_dir / sha256[:2]
-        sub_dir.mkdir(parents=True, exist_ok=True)
-        disk_path = str(sub_dir / sha256)
-
-        with open(disk_path, "wb") as f:
-            f.write(data)
-
-    return Attachment.create(
-        message_id=message_id,
-        filename=filename,
-        content_type=content_type,
-        size_bytes=len(data),
-        sha256=sha256,
-        disk_path=disk_path,
-    )
+def save_attachments(
+    message_id: int,
+    items: Sequence[tuple[str, str, Blob]],
+) -> list[Attachment]:
+    """Save (filename, content_type, data) items to disk and record them together.
+
+    All database rows are inserted in a single transaction (see store_blobs).
+    """
+    return Attachment.create_many(message_id, store_blobs(items))
+
+
+def save_attachment(
+    message_id: int,
+    filename: str,
+    content_type: str,
+    data: Blob,
+) -> Attachment:
+    """Save attachment data to disk and create a database record."""
+    return save_attachments(message_id, [(filename, content_type, data)])[0]
@@ -1,9 +1,11 @@
 """SMTP email sending service."""
 
+import re
 import smtplib
-from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from collections.abc import Generator, Sequence
+from contextlib import contextmanager
+from email import policy
+from email.message import EmailMessage
 from pathlib import Path
 
 import mistune
@@ -12,6 +14,12 @@ from flask import current_app
 from outbox.models.attachment import Attachment
 from outbox.models.message import Message
 
+# Anything markdown could render differently from plain text: inline markup,
+# links, HTML and entities, escapes, and block markers at the start of a line
+# (headings and quotes are covered by # and >, list items, setext underlines,
+# indented code)
+_MARKDOWN_SYNTAX = re.compile(r"[*_`#\[>~|<&\\]|^(?: {4}|\t| {0,3}(?:[-+=]|\d+[.)]))", re.MULTILINE)
+
 
 def _try_login(server: smtplib.SMTP, username: str, password: str) -> None:
     """Attempt SMTP login only if the server supports AUTH."""
@@ -21,82 +29,156 @@ def _try_login(server: smtplib.SMTP, username: str, password: str) -> None:
         server.login(username, password)
 
 
-def send_message(message: Message) -> None:
+def _connect() -> smtplib.SMTP:
+    """Open an SMTP connection, with STARTTLS and login as configured."""
+    config = current_app.config
+    smtp_server = config["SMTP_SERVER"]
+    if not smtp_server:
+        raise RuntimeError("SMTP_SERVER not configured")
+
+    server = smtplib.SMTP(smtp_server, config["SMTP_PORT"])
+    try:
+        if config["SMTP_USE_TLS"]:
+            server.starttls()
+            server.ehlo()
+        _try_login(server, config["SMTP_USERNAME"], config["SMTP_PASSWORD"])
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+class SmtpSession:
+    """One SMTP connection shared by several sends.
+
+    Connects on first use. Before each later send the connection is checked
+    with NOOP and reopened if the server has dropped it; a connection that
+    fails mid-send is discarded so the next message starts fresh.
+    """
+
+    def __init__(self) -> None:
+        self._server: smtplib.SMTP | None = None
+
+    def sendmail(
+        self,
+        from_addr: str,
+        to_addrs: list[str],
+        msg: bytes,
+        mail_options: Sequence[str] = (),
+    ) -> None:
+        """Send an already serialized message (CRLF line endings)."""
+        server = self._server
+        if server is not None:
+            try:
+                server.noop()
+            except OSError:
+                self._discard()
+                server = None
+        if server is None:
+            server = self._server = _connect()
+
+        try:
+            server.sendmail(from_addr, to_addrs, msg, mail_options)
+        except smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused:
+            # The server rejected this message; the connection itself is still usable
+            raise
+        except OSError:
+            self._discard()
+            raise
+
+    def _discard(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def close(self) -> None:
+        """Say QUIT to the server if connected, then close the connection."""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except OSError:
+                pass
+            self._discard()
+
+
+@contextmanager
+def smtp_session() -> Generator[SmtpSession]:
+    """Yield an SmtpSession that is closed when the block exits."""
+    session = SmtpSession()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def send_message(message: Message, session: SmtpSession | None = None) -> None:
     """Send a message via SMTP.
 
+    Pass a session from smtp_session() to reuse one connection across
+    messages; without one, a connection is opened for this message only.
     Raises an exception on failure so the caller can handle retries.
     """
-    smtp_server = current_app.config["SMTP_SERVER"]
-    smtp_port = current_app.config["SMTP_PORT"]
-    smtp_use_tls = current_app.config["SMTP_USE_TLS"]
-    smtp_username = current_app.config["SMTP_USERNAME"]
-    smtp_password = current_app.config["SMTP_PASSWORD"]
-
-    if not smtp_server:
+    if not current_app.config["SMTP_SERVER"]:
         raise RuntimeError("SMTP_SERVER not configured")
 
-    attachments = Attachment.get_for_message(message.id)
-
-    # Build MIME message
-    if attachments:
-        msg = MIMEMultipart("mixed")
-        body_part = _build_body(message)
-        msg.attach(body_part)
-        for att in attachments:
-            att_part = _build_attachment(att)
-            if att_part:
-                msg.attach(att_part)
-    else:
-        msg = _build_body(message)
+    to_addrs = message.to_list()
+    cc_addrs = message.cc_list()
+    all_recipients = [*to_addrs, *cc_addrs, *message.bcc_list()]
 
+    msg = EmailMessage()
     msg["From"] = message.from_address
-    msg["To"] = ", ".join(message.to_list())
-    cc = message.cc_list()
-    if cc:
-        msg["Cc"] = ", ".join(cc)
+    msg["To"] = ", ".join(to_addrs)
+    if cc_addrs:
+        msg["Cc"] = ", ".join(cc_addrs)
     msg["Subject"] = message.subject
 
-    # Collect all recipients
-    all_recipients = message.to_list() + message.cc_list() + message.bcc_list()
+    _set_body(msg, message)
+    for att in Attachment.get_for_message(message.id):
+        _add_attachment(msg, att)
+
+    # Serialize once, before any connection work; non-ASCII addresses need SMTPUTF8
+    if message.from_address.isascii() and all(addr.isascii() for addr in all_recipients):
+        raw = msg.as_bytes(policy=policy.SMTP)
+        mail_options: tuple[str, ...] = ()
+    else:
+        raw = msg.as_bytes(policy=policy.SMTPUTF8)
+        mail_options = ("SMTPUTF8", "BODY=8BITMIME")
 
     # Send
-    if smtp_use_tls:
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.ehlo()
-            _try_login(server, smtp_username, smtp_password)
-            server.sendmail(message.from_address, all_recipients, msg.as_string())
+    if session is not None:
+        session.sendmail(message.from_address, all_recipients, raw, mail_options)
     else:
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            _try_login(server, smtp_username, smtp_password)
-            server.sendmail(message.from_address, all_recipients, msg.as_string())
+        with smtp_session() as one_off:
+            one_off.sendmail(message.from_address, all_recipients, raw, mail_options)
+
 
+def _set_body(msg: EmailMessage, message: Message) -> None:
+    """Set the body of the email; markdown gets a plain text alternative.
 
-def _build_body(message: Message) -> MIMEMultipart | MIMEText:
-    """Build the body part of the email."""
+    Markdown with no markdown syntax in it is sent as plain text alone, since
+    the HTML part would only wrap the same text in paragraphs. Text is
+    quoted-printable so it survives servers without 8BITMIME.
+    """
     if message.body_type == "html":
-        return MIMEText(message.body, "html", "utf-8")
-    elif message.body_type == "markdown":
+        msg.set_content(message.body, subtype="html", cte="quoted-printable")
+    elif message.body_type == "markdown" and _MARKDOWN_SYNTAX.search(message.body):
+        msg.set_content(message.body, cte="quoted-printable")
         html_body = str(mistune.html(message.body))
-        alt = MIMEMultipart("alternative")
-        alt.attach(MIMEText(message.body, "plain", "utf-8"))
-        alt.attach(MIMEText(html_body, "html", "utf-8"))
-        return alt
+        msg.add_alternative(html_body, subtype="html", cte="quoted-printable")
     else:
-        # plain text
-        return MIMEText(message.body, "plain", "utf-8")
+        # plain text, or markdown that renders as plain paragraphs
+        msg.set_content(message.body, cte="quoted-printable")
 
 
-def _build_attachment(att: Attachment) -> MIMEApplication | None:
-    """Build a MIME attachment from an Attachment record."""
-    path = Path(att.disk_path)
-    if not path.exists():
-        return None
-
-    with open(path, "rb") as f:
-        data = f.read()
+def _add_attachment(msg: EmailMessage, att: Attachment) -> None:
+    """Attach a stored blob; attachments whose file is missing are skipped."""
+    try:
+        data = Path(att.disk_path).read_bytes()
+    except FileNotFoundError:
+        return
 
-    part = MIMEApplication(data)
-    part.add_header("Content-Disposition", "attachment", filename=att.filename)
-    part.add_header("Content-Type", att.content_type)
-    return part
+    maintype, _, subtype = att.content_type.partition("/")
+    if not subtype or maintype in ("multipart", "message"):
+        # Not a leaf type we can carry as raw bytes
+        maintype, subtype = "application", "octet-stream"
+    msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=att.filename)
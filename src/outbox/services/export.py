@@ -1,20 +1,23 @@
 """XLSX export helper."""
 
+import os
 import tempfile
+from collections.abc import Iterable, Sequence
 from typing import Any
 
 from openpyxl import Workbook
 
 
-def write_xlsx(headers: list[str], rows: list[list[Any]], filename: str) -> str:
-    """Write rows to a temp XLSX file, return the path."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = filename.removesuffix(".xlsx")
+def write_xlsx(headers: list[str], rows: Iterable[Sequence[Any]], filename: str) -> tuple[str, int]:
+    """Stream rows to a temp XLSX file, return the path and the number of rows written."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=filename.removesuffix(".xlsx"))
     ws.append(headers)
+    count = 0
     for row in rows:
         ws.append(row)
-    tmp = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
-    tmp.close()
-    wb.save(tmp.name)
-    return tmp.name
+        count += 1
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    wb.save(path)
+    return path, count
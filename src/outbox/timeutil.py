@@ -0,0 +1,27 @@
+"""Timestamp helpers."""
+
+import time
+
+# (epoch second, formatted date-time prefix) for the most recent call
+_prefix_cache: tuple[int, str] = (-1, "")
+
+
+def utc_iso(epoch_ns: int) -> str:
+    """Format a time.time_ns() value as an ISO 8601 UTC string with microseconds.
+
+    Same form as ``datetime.isoformat()`` on an aware UTC datetime (always
+    including the fraction), built without a datetime object; the date-time
+    prefix is reused while the second is unchanged.
+    """
+    global _prefix_cache
+    seconds, ns = divmod(epoch_ns, 1_000_000_000)
+    cached_second, prefix = _prefix_cache
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _prefix_cache = (seconds, prefix)
+    return f"{prefix}.{ns // 1000:06d}+00:00"
+
+
+def utc_now_iso() -> str:
+    """Return the current UTC time as an ISO 8601 string with microseconds."""
+    return utc_iso(time.time_ns())
@@ -0,0 +1,21 @@
+"""Helpers shared by the web blueprints."""
+
+from flask import request
+
+
+def clamp_int(name: str, default: int, lo: int, hi: int) -> int:
+    """Read an integer query argument, clamped to [lo, hi].
+
+    Missing or malformed values fall back to ``default`` instead of raising.
+    """
+    raw = request.args.get(name)
+    if raw is None:
+        return default
+    if raw.isdigit():
+        value = int(raw)
+    else:
+        try:
+            value = int(raw)
+        except ValueError:
+            return default
+    return min(max(value, lo), hi)
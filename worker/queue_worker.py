@@ -3,8 +3,15 @@
 import logging
 import signal
 import sys
+import threading
 import time
-from datetime import UTC, datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from outbox.models.message import Message
+    from outbox.services.email_sender import SmtpSession
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,13 +19,16 @@ logging.basicConfig(
 )
 log = logging.getLogger("outbox.worker")
 
-_running = True
+# A message still 'sending' after this long belongs to a worker that died mid-batch
+_STALE_SENDING_SECONDS = 15 * 60
+
+# Set by the signal handler; the poll wait returns as soon as it is set
+_shutdown = threading.Event()
 
 
 def _handle_signal(signum: int, frame: object) -> None:
-    global _running
     log.info("Received signal %s, shutting down...", signum)
-    _running = False
+    _shutdown.set()
 
 
 signal.signal(signal.SIGINT, _handle_signal)
@@ -37,41 +47,52 @@ def run() -> None:
     retry_base = app.config["QUEUE_RETRY_BASE_SECONDS"]
     retry_max = app.config["QUEUE_RETRY_MAX_SECONDS"]
     retention_days = app.config["RETENTION_DAYS"]
+    concurrency = max(1, app.config["QUEUE_SMTP_CONCURRENCY"])
+    retry_delays = _retry_delays(max_retries, retry_base, retry_max)
 
     log.info(
-        "Worker started (poll=%ds, batch=%d, retries=%d, retention=%dd)",
+        "Worker started (poll=%ds, batch=%d, connections=%d, retries=%d, retention=%dd)",
         poll_interval,
         batch_size,
+        concurrency,
         max_retries,
         retention_days,
     )
 
-    while _running:
+    while not _shutdown.is_set():
         with app.app_context():
             try:
-                _process_batch(batch_size, max_retries, retry_base, retry_max)
+                _reclaim_stale()
+                _process_batch(batch_size, concurrency, max_retries, retry_delays)
                 _purge_old(retention_days)
             except Exception:
                 log.exception("Error in worker loop")
 
-        # Sleep in small increments so we can respond to signals
-        for _ in range(poll_interval * 10):
-            if not _running:
-                break
-            time.sleep(0.1)
+        _shutdown.wait(timeout=poll_interval)
 
     log.info("Worker stopped.")
 
 
+def _retry_delays(max_retries: int, retry_base: int, retry_max: int) -> tuple[int, ...]:
+    """Precompute the backoff delay for each retry: base * 2^n, capped at max.
+
+    The shift is clamped so a large max_retries cannot build huge integers.
+    """
+    return tuple(min(retry_base << min(n, 30), retry_max) for n in range(max_retries + 1))
+
+
 def _process_batch(
     batch_size: int,
+    concurrency: int,
     max_retries: int,
-    retry_base: int,
-    retry_max: int,
+    retry_delays: tuple[int, ...],
 ) -> None:
-    """Process a batch of pending messages."""
+    """Claim a batch of pending messages and send it.
+
+    If sending stops early, the messages that were never attempted are put
+    back to 'queued' rather than left in 'sending'.
+    """
     from outbox.models.message import Message
-    from outbox.services.email_sender import send_message
 
     messages = Message.get_pending_batch(batch_size)
     if not messages:
@@ -79,34 +100,115 @@ def _process_batch(
 
     log.info("Processing %d message(s)", len(messages))
 
-    for message in messages:
-        message.update_status("sending")
-        log.info("Sending message %s to %s", message.uuid, message.to_list())
+    # Mark the whole batch at once; each message then gets one terminal update
+    Message.mark_sending(messages)
+    pending = deque(messages)
+    try:
+        _drain_all(pending, concurrency, max_retries, retry_delays)
+    finally:
+        # Whatever no thread got to goes back to the queue instead of staying 'sending'
+        if pending:
+            Message.requeue_unsent(list(pending))
+
+
+def _drain_all(
+    pending: deque[Message],
+    concurrency: int,
+    max_retries: int,
+    retry_delays: tuple[int, ...],
+) -> None:
+    """Send every message in ``pending`` over up to ``concurrency`` SMTP connections.
+
+    Each sending thread holds one connection and takes messages from the shared
+    queue until it is empty, so a slow server reply only holds up that thread.
+    """
+    from flask import current_app
 
+    from outbox.services.email_sender import smtp_session
+
+    def drain() -> None:
         try:
-            send_message(message)
-            message.update_status("sent")
-            log.info("Message %s sent successfully", message.uuid)
-        except Exception as exc:
-            error_msg = str(exc)
-            log.warning("Message %s failed: %s", message.uuid, error_msg)
-
-            message.retries_remaining -= 1
-            if message.retries_remaining > 0:
-                # Exponential backoff: base * 2^(max - remaining), capped at max
-                exponent = max_retries - message.retries_remaining
-                delay = min(retry_base * (2**exponent), retry_max)
-                next_retry = (datetime.now(UTC) + timedelta(seconds=delay)).isoformat()
-                message.update_status("failed", last_error=error_msg, next_retry_at=next_retry)
-                log.info(
-                    "Message %s will retry in %ds (%d retries remaining)",
-                    message.uuid,
-                    delay,
-                    message.retries_remaining,
-                )
-            else:
-                message.update_status("dead", last_error=error_msg)
-                log.warning("Message %s is dead (no retries left)", message.uuid)
+            with smtp_session() as session:
+                while pending:
+                    try:
+                        message = pending.popleft()
+                    except IndexError:
+                        break
+                    _send_one(message, session, max_retries, retry_delays)
+        except Exception:
+            # Only this thread stops; the others keep draining, and whatever is
+            # left at the end is requeued by _process_batch
+            log.exception("Sending thread %s stopped", threading.current_thread().name)
+
+    threads = min(concurrency, len(pending))
+    if threads == 1:
+        drain()
+        return
+
+    # Every thread needs its own app context, and so its own pooled DB connection
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+
+    def drain_in_context() -> None:
+        with app.app_context():
+            drain()
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="outbox-smtp") as pool:
+        for _ in range(threads):
+            pool.submit(drain_in_context)
+
+
+def _send_one(
+    message: Message,
+    session: SmtpSession,
+    max_retries: int,
+    retry_delays: tuple[int, ...],
+) -> None:
+    """Send one message, recording success or scheduling a retry."""
+    from outbox.services.email_sender import send_message
+    from outbox.timeutil import utc_iso
+
+    log.info("Sending message %s to %s", message.uuid, message.to_list())
+
+    try:
+        send_message(message, session)
+        message.update_status("sent")
+        log.info("Message %s sent successfully", message.uuid)
+    except Exception as exc:
+        error_msg = str(exc)
+        log.warning("Message %s failed: %s", message.uuid, error_msg)
+
+        message.retries_remaining -= 1
+        if message.retries_remaining > 0:
+            # Exponential backoff indexed by retries used; messages submitted with more
+            # retries than QUEUE_MAX_RETRIES start at the base delay
+            exponent = max_retries - message.retries_remaining
+            delay = retry_delays[min(max(exponent, 0), max_retries)]
+            # One clock reading for both the update time and the retry time
+            now_ns = time.time_ns()
+            message.update_status(
+                "failed",
+                last_error=error_msg,
+                next_retry_at=utc_iso(now_ns + delay * 1_000_000_000),
+                now=utc_iso(now_ns),
+            )
+            log.info(
+                "Message %s will retry in %ds (%d retries remaining)",
+                message.uuid,
+                delay,
+                message.retries_remaining,
+            )
+        else:
+            message.update_status("dead", last_error=error_msg)
+            log.warning("Message %s is dead (no retries left)", message.uuid)
+
+
+def _reclaim_stale() -> None:
+    """Requeue messages stranded in 'sending' by a worker that stopped mid-batch."""
+    from outbox.models.message import Message
+
+    reclaimed = Message.reclaim_stale_sending(_STALE_SENDING_SECONDS)
+    if reclaimed > 0:
+        log.warning("Requeued %d message(s) stuck in 'sending'", reclaimed)
 
 
 def _purge_old(retention_days: int) -> None: